@@ -14,12 +14,15 @@
 
 import cv2
 import math
+import convolution
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 0; # 0 if you have one camera, 1 or > 1 otherwise
 
+convolution.verbose = True; # report the choice of spatial / frequency domain filtering
+
 #####################################################################
 
 # this function is called as a call-back everytime the trackbar is moved
@@ -88,9 +91,10 @@ if cap.open(camera_to_use):
         if not(neighbourhood % 2):
             neighbourhood = neighbourhood + 1;
 
-        # perform Gaussian smoothing using NxN neighbourhood
+        # perform Gaussian smoothing using NxN neighbourhood (in the spatial or frequency domain,
+        # whichever is predicted to be fastest for this neighbourhood size)
 
-        smoothed_img = cv2.GaussianBlur(frame, (neighbourhood, neighbourhood), sigma, sigma, borderType=cv2.BORDER_REPLICATE);
+        smoothed_img = convolution.GaussianBlur(frame, (neighbourhood, neighbourhood), sigma, sigma, border=cv2.BORDER_REPLICATE);
 
         # perform bilateral filtering using a neighbourhood calculated automatically from sigmaS
 
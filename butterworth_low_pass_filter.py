@@ -3,6 +3,8 @@
 # Example : perform butterworth low pass filtering in fourier space of
 # image frame from a video file specified on the command line
 # (e.g. python FILE.py video_file) or from an attached web camera
+# (or gaussian / band pass / band reject filtering, selected via the
+# "filter type" track bar)
 
 # Author : Toby Breckon, toby.breckon@durham.ac.uk
 
@@ -14,44 +16,36 @@
 
 import cv2
 import sys
-import numpy as np
 import math
+from fft_backend import autotune, autotune_summary
+from fourier_filters import FrequencyFilterBank, SpectrumView, band_filters, normalize_image
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
 
-recompute_filter = True;
+use_real_dft = True; # filter only the half spectrum of the (real) input
+batch_size = 1; # frames filtered together when reading from a video file (1 = off, e.g. 8)
+use_colour = False; # filter all three colour channels (toggle with "c")
+show_spectrum = True; # display the magnitude spectrum (toggle with "s")
+spectrum_size = 256; # maximum size of the (low resolution) spectrum display
 
-#####################################################################
-
-# create a butterworth low pass filter
-
-def create_butterworth_low_pass_filter(width, height, D, n):
-    lp_filter = np.zeros((height, width, 2), np.float32);
-    centre = (width / 2, height / 2);
-
-    # based on the forumla in lecture 8 (2015 version)
-	# see also HIPR2 on-line
-
-    for i in range(0, lp_filter.shape[1]): # image width
-        for j in range(0, lp_filter.shape[0]): # image height
-            radius = max(1, math.sqrt(math.pow((i - centre[0]), 2.0) + math.pow((j - centre[1]), 2.0)));
-            lp_filter[j,i] = 1 / (1 + math.pow((radius / D), (2 * n)));
-
-    return lp_filter
+# the kinds of filter that can be selected with the "filter type" trackbar (all are cached
+# once built, so switching between them is instant)
 
+filter_types = ["butterworth_low_pass", "butterworth_high_pass",
+                "gaussian_low_pass", "gaussian_high_pass",
+                "butterworth_band_pass", "butterworth_band_reject",
+                "gaussian_band_pass", "gaussian_band_reject"];
 
 #####################################################################
 
 # this function is called as a call-back everytime the trackbar is moved
-# to signal we need to reconstruct the filter
+# (here we just do nothing)
 
-def reset_butterworth_filter(_):
-    global recompute_filter;
-    recompute_filter = True;
-    return;
+def nothing(x):
+    pass
 
 #####################################################################
 
@@ -82,9 +76,13 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     # add some track bar controllers for settings
 
     radius = 5;
-    cv2.createTrackbar("radius", windowName4, radius, 100, reset_butterworth_filter);
+    cv2.createTrackbar("radius", windowName4, radius, 100, nothing);
     order = 1;
-    cv2.createTrackbar("order", windowName4, order, 10, reset_butterworth_filter);
+    cv2.createTrackbar("order", windowName4, order, 10, nothing);
+    filter_type = 0;
+    cv2.createTrackbar("filter type", windowName4, filter_type, len(filter_types) - 1, nothing);
+    band_width = 10;
+    cv2.createTrackbar("band width", windowName4, band_width, 100, nothing);
 
     # if video file successfully open then read frame from video
 
@@ -101,82 +99,161 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     nheight = cv2.getOptimalDFTSize(hieght);
     nwidth = cv2.getOptimalDFTSize(width);
 
-    while (keep_processing):
+    # Performance of DFT calculation, via the FFT, is better for array sizes of power of two.
+    # Arrays whose size is a product of 2's, 3's, and 5's are also processed quite efficiently.
+    # Hence the filter bank zero pads each image to this optimal size before finding the DFT.
+
+    filter_bank = FrequencyFilterBank(nwidth, nheight, half_spectrum=use_real_dft);
+    filter_bank.add_filter("filter", filter_types[filter_type], D=radius, n=order);
 
-        # if video file successfully open then read frame from video
+    # the low resolution view of the spectrum used for display
 
-        if (cap.isOpened):
-            ret, frame = cap.read();
+    spectrum_view = SpectrumView(nwidth, nheight, max_size=spectrum_size);
+
+    # when processing a video file (rather than a live camera) we can read ahead, so frames are
+    # instead filtered in batches of batch_size - all using a single (multi-threaded) batched DFT
+    # (off by default, as at 1080p on a single core this is ~ 1.3x slower per frame than filtering
+    # each frame as it is read - so only worth trying with several FFT threads)
+
+    use_batch = (len(sys.argv) == 2) and (batch_size > 1);
+    batch_frames = [];
+    batch_index = 0;
+    spectrum_index = None;
+
+    # pick the fastest of the available FFT implementations on this machine for this DFT size
+    # (and batch size) - this is only benchmarked the first time, after which the choice is
+    # read back from a cache (see fft_backend.autotune()) - and report the choice
+
+    if (use_real_dft or use_batch):
+        name, timings, cached = autotune(nwidth, nheight, batch=(batch_size if use_batch else 1));
+        print(autotune_summary(name, timings, cached));
+
+    while (keep_processing):
 
         # start a timer (to see how long processing and display takes)
 
         start_t = cv2.getTickCount();
 
-         # convert to grayscale
+        # get the current filter settings from the track bars
+
+        radius = cv2.getTrackbarPos("radius",windowName4);
+        order = cv2.getTrackbarPos("order",windowName4);
+        band_width = cv2.getTrackbarPos("band width",windowName4);
+
+        if (filter_type != cv2.getTrackbarPos("filter type",windowName4)):
+            filter_type = cv2.getTrackbarPos("filter type",windowName4);
+            print("Filter type: " + filter_types[filter_type]);
 
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+        # band filters pass (or reject) the band of band width centred on the radius, and
+        # only the butterworth filters have an order
 
-        # Performance of DFT calculation, via the FFT, is better for array sizes of power of two.
-        # Arrays whose size is a product of 2's, 3's, and 5's are also processed quite efficiently.
-        # Hence ee modify the size of the array tothe optimal size (by padding zeros) before finding DFT.
+        kind = filter_types[filter_type];
+        if (kind in band_filters):
+            parameters = {"inner_radius" : max(0, radius - (band_width // 2)),
+                          "outer_radius" : radius + (band_width // 2)};
+        else:
+            parameters = {"D" : radius};
+        if (kind.startswith("butterworth")):
+            parameters["n"] = order;
 
-        pad_right = nwidth - width;
-        pad_bottom = nheight - hieght;
-        nframe = cv2.copyMakeBorder(gray_frame,0,pad_bottom,0,pad_right,cv2.BORDER_CONSTANT, value = 0);
+        # (the filter is only replaced, and the spectrum refiltered, if a setting has changed -
+        # and then the rest of the current batch is refiltered too, so the display does not
+        # lag behind the track bars until the next batch is read)
 
-        # perform the DFT and get complex output
+        if (filter_bank.add_filter("filter", kind, **parameters) and use_batch and (batch_index < len(batch_frames))):
+            batch_filtered_imgs = filter_bank.apply_batch("filter");
 
-        dft = cv2.dft(np.float32(nframe),flags = cv2.DFT_COMPLEX_OUTPUT);
+        # (filters are cached by their kind and parameters so they are only
+        # (re)built when the trackbars move to settings not used recently)
 
-        # shift it so that we the zero-frequency, F(0,0), DC component to the center of the spectrum.
+        if (use_batch):
 
-        dft_shifted = np.fft.fftshift(dft);
+            # once all of the current batch has been displayed read the next batch of frames
+            # from the video file (converted to grayscale unless filtering in colour) and
+            # filter them all together
 
-        # perform low pass filtering
+            if (batch_index >= len(batch_frames)):
+                batch_frames = [];
+                while (len(batch_frames) < batch_size):
+                    ret, frame = cap.read();
+                    if not(ret):
+                        break;
+                    if (use_colour):
+                        input_frame = frame;
+                    else:
+                        input_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
-        radius = cv2.getTrackbarPos("radius",windowName4);
-        order = cv2.getTrackbarPos("order",windowName4);
+                    batch_frames.append(input_frame);
 
-        # butterworth is slow to construct so only do it when needed (i.e. trackbar changes)
+                # stop at the end of the video file
 
-        if (recompute_filter):
-            lp_filter = create_butterworth_low_pass_filter(nwidth, nheight, radius, order);
-            recompute_filter = False;
+                if (len(batch_frames) == 0):
+                    break;
 
-        dft_filtered = cv2.mulSpectrums(dft_shifted, lp_filter, flags=0);
+                batch_filtered_imgs = filter_bank.process_batch(batch_frames)["filter"];
+                batch_index = 0;
 
-        # shift it back to original quaderant ordering
+            input_frame = batch_frames[batch_index];
+            filtered_img = batch_filtered_imgs[batch_index];
+            spectrum_index = batch_index;
+            batch_index += 1;
 
-        dft = np.fft.fftshift(dft_filtered);
+        else:
 
-        # recover the original image via the inverse DFT
+            # if video file successfully open then read frame from video
 
-        filtered_img = cv2.dft(dft, flags = cv2.DFT_INVERSE);
+            if (cap.isOpened):
+                ret, frame = cap.read();
 
-        # normalized the filtered image into 0 -> 255 (8-bit grayscale) so we can see the output
+            if (use_colour):
+
+                # filter the three colour channels together as a batch of 3 images (i.e. via
+                # a single batched DFT with the filter applied to all three at once)
+
+                input_frame = frame;
+
+                filtered_img = filter_bank.process_batch([input_frame])["filter"][0];
+                spectrum_index = 0;
 
-        minVal, maxVal, minLoc, maxLoc = cv2.minMaxLoc(filtered_img[:,:,0]);
-        filtered_img_normalized = filtered_img[:,:,0] * (1.0/(maxVal-minVal)) + ((-minVal)/(maxVal-minVal));
-        filtered_img_normalized = np.uint8(filtered_img_normalized * 255);
+            else:
 
-        # calculate the magnitude spectrum and log transform + scale it for visualization
+                # convert to grayscale
 
-        magnitude_spectrum = np.log(cv2.magnitude(dft_filtered[:,:,0],dft_filtered[:,:,1]));
+                input_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
-        # create a 8-bit image to put the magnitude spectrum into
+                # perform the DFT (of the zero padded image) and then the filtering, recovering
+                # the filtered image via the inverse DFT
 
-        magnitude_spectrum_normalized = np.zeros((nheight,nwidth,1), np.uint8);
+                filter_bank.forward(input_frame);
+                filtered_img = filter_bank.apply("filter");
+                spectrum_index = None;
 
-        # normalized the magnitude spectrum into 0 -> 255 (8-bit grayscale) so we can see the output
+        # normalized the filtered image into 0 -> 255 (8-bit grayscale) so we can see the output
 
-        cv2.normalize(np.uint8(magnitude_spectrum), magnitude_spectrum_normalized, alpha=0, beta=255, norm_type=cv2.NORM_MINMAX);
+        filtered_img_normalized = normalize_image(filtered_img);
 
         # display images
 
-        cv2.imshow(windowName,gray_frame);
-        cv2.imshow(windowName2,magnitude_spectrum_normalized);
+        cv2.imshow(windowName,input_frame);
         cv2.imshow(windowName3,filtered_img_normalized);
-        cv2.imshow(windowName4,lp_filter[:,:,0] * 255);
+
+        # the magnitude spectrum is only needed for display so only calculate it when it is
+        # shown and its window is visible - and then only at a low resolution, sampling it
+        # directly in the shifted order so that the zero-frequency, F(0,0), DC component is at
+        # the center of it (see fourier_filters.SpectrumView)
+
+        if (show_spectrum and (cv2.getWindowProperty(windowName2, cv2.WND_PROP_VISIBLE) >= 1)):
+
+            # log transform + scale the magnitude spectrum for visualization
+
+            magnitude_spectrum_normalized = filter_bank.render_spectrum(spectrum_view, "filter", spectrum_index);
+
+            cv2.imshow(windowName2,magnitude_spectrum_normalized);
+
+        # similarly only render the filter itself for display when its window is visible
+
+        if (show_spectrum and (cv2.getWindowProperty(windowName4, cv2.WND_PROP_VISIBLE) >= 1)):
+            cv2.imshow(windowName4,spectrum_view.render_filter(filter_bank.get_filter("filter")));
 
         # stop timer and convert to ms. (to see how long processing and display takes)
 
@@ -196,10 +273,15 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         # It can also be set to detect specific key strokes by recording which key is pressed
 
-        # e.g. if user presses "x" then exit
+        # e.g. if user presses "x" then exit, "c" to toggle filtering in colour or "s" to
+        # toggle the display of the spectrum
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('c')):
+            use_colour = not(use_colour);
+        elif (key == ord('s')):
+            show_spectrum = not(show_spectrum);
 
     # close all windows
 
@@ -13,29 +13,18 @@
 #####################################################################
 
 import cv2
-import numpy as np
 import sys
+from histogram_plot import HistogramPlot
+from histogram_tools import CLAHEPool, sampled_histogram
+from point_transforms import split_luminance, merge_luminance
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
 
-#####################################################################
-
-# basic grayscale histogram drawing in raw OpenCV using lines
-
-# adapted from:
-# https://raw.githubusercontent.com/Itseez/opencv/master/samples/python2/hist.py
-
-def hist_lines(hist):
-    h = np.ones((300,256,3)) * 255 # white background
-    cv2.normalize(hist,hist,0,255,cv2.NORM_MINMAX)
-    hist=np.int32(np.around(hist))
-    for x,y in enumerate(hist):
-        cv2.line(h,(x,0),(x,y),(0,0,0)) # black bars
-    y = np.flipud(h)
-    return y
+use_colour = False; # process the luminance of the colour image (toggle with "c")
+sample_budget = 250000; # max. pixels sampled for each histogram (0 to use every pixel)
 
 #####################################################################
 
@@ -71,6 +60,11 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     cv2.namedWindow(windowName3, cv2.WINDOW_NORMAL);
     cv2.namedWindow(windowName4, cv2.WINDOW_NORMAL);
 
+    # the histogram plots (each drawn into its own image, reused every frame)
+
+    input_plot = HistogramPlot();
+    output_plot = HistogramPlot();
+
     # add some track bar controllers for settings
 
     clip_limit = 2;
@@ -78,6 +72,11 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     tile_size = 8;
     cv2.createTrackbar("tile size", windowName4, tile_size, 64, nothing);
 
+    # the CLAHE filter objects - only created when the parameters change
+    # (see histogram_tools.py)
+
+    clahe_pool = CLAHEPool();
+
     while (keep_processing):
 
         # if video file successfully open then read frame from video
@@ -85,9 +84,13 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
         if (cap.isOpened):
             ret, frame = cap.read();
 
-        # convert to grayscale
+        # convert to grayscale - or for colour, convert to YCrCb and process
+        # its luminance channel (Y) in place of the grayscale image
 
-        gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+        if (use_colour):
+            converted, gray_img = split_luminance(frame);
+        else:
+            gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
         # perform contrast limited adaptive equalization
         # based on example at:
@@ -96,19 +99,29 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
         # get parameters from track bars
 
         clip_limit = cv2.getTrackbarPos("clip limit", windowName4);
-        tile_size = cv2.getTrackbarPos("tile size", windowName4);
+        tile_size = max(1, cv2.getTrackbarPos("tile size", windowName4)); # (0 is not valid)
 
         # perform filtering
 
-        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(tile_size,tile_size)); # create filter
+        clahe = clahe_pool.get(clip_limit, tile_size); # get (or create) filter
         output = clahe.apply(gray_img); # apply filter
 
+        # for colour, put the processed luminance back and convert to BGR
+
+        if (use_colour):
+            output_img = merge_luminance(converted, output);
+        else:
+            output_img = output;
+
         # display image
 
-        cv2.imshow(windowName1,gray_img);
-        cv2.imshow(windowName2,hist_lines(cv2.calcHist([gray_img],[0],None,[256],[0,256])));
-        cv2.imshow(windowName3,output);
-        cv2.imshow(windowName4,hist_lines(cv2.calcHist([output],[0],None,[256],[0,256])));
+        # (for large images, the histograms are estimated from a sample of
+        # sample_budget pixels - see histogram_tools.py)
+
+        cv2.imshow(windowName1,frame if use_colour else gray_img);
+        cv2.imshow(windowName2,input_plot.bars(sampled_histogram(gray_img, sample_budget)[0]));
+        cv2.imshow(windowName3,output_img);
+        cv2.imshow(windowName4,output_plot.bars(sampled_histogram(output, sample_budget)[0]));
 
         # start the event loop - essential
 
@@ -126,6 +139,8 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('c')):
+            use_colour = not(use_colour);
 
     # close all windows
 
@@ -0,0 +1,141 @@
+#####################################################################
+
+# Example : colour grading via a 3D colour look up table (LUT) on an
+# image from an attached web camera (or video file specified on command
+# line)
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import math
+import sys
+import numpy as np
+from colour_lut import create_colour_lut, load_cube
+
+#####################################################################
+
+keep_processing = True;
+camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
+
+cube_file = None; # a .cube 3D LUT file to grade with (None for the built in grade)
+use_grading = True; # (toggle with "g")
+
+#####################################################################
+
+# the built in colour grade ("teal and orange") - the shadows are pushed
+# towards teal and the highlights towards orange, and the saturation is
+# increased, so each output channel depends on all three input channels
+# (which a per channel LUT, as in gamma.py, cannot do)
+
+# (this is only evaluated at the points of the 33 x 33 x 33 LUT grid, not
+# for every pixel)
+
+def teal_and_orange(b, g, r):
+    luminance = (0.114 * b) + (0.587 * g) + (0.299 * r);
+    t = luminance / 255.0;
+
+    b, g, r = [luminance + 1.2 * (channel - luminance) for channel in (b, g, r)];
+    b = b + 30 * (1 - t) - 30 * t;
+    g = g + 10 * (1 - t) + 5 * t;
+    r = r - 20 * (1 - t) + 30 * t;
+
+    return b, g, r;
+
+#####################################################################
+
+# define video capture object
+
+cap = cv2.VideoCapture();
+
+# define display window name
+
+windowName = "Live Camera Input"; # window name
+windowName2 = "Colour Graded (3D LUT)"; # window name
+
+# if command line arguments are provided try to read video_name
+# otherwise default to capture from attached H/W camera
+
+if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
+    or (cap.open(camera_to_use))):
+
+    # create window by name (as resizable)
+
+    cv2.namedWindow(windowName, cv2.WINDOW_AUTOSIZE);
+    cv2.namedWindow(windowName2, cv2.WINDOW_AUTOSIZE);
+
+    # load (or create) the 3D LUT and compute its output for every possible
+    # colour once, up front, so each frame then only needs a single look up
+    # per pixel
+
+    if cube_file is not None:
+        colour_lut = load_cube(cube_file);
+    else:
+        colour_lut = create_colour_lut(teal_and_orange, 33);
+    colour_lut.bake();
+
+    graded_img = None;
+
+    while (keep_processing):
+
+        # if video file successfully open then read frame from video
+
+        if (cap.isOpened):
+            ret, frame = cap.read();
+
+        # start a timer (to see how long processing and display takes)
+
+        start_t = cv2.getTickCount();
+
+        # apply the 3D LUT (into the same output image each frame)
+
+        if (use_grading):
+            if (graded_img is None) or (graded_img.shape != frame.shape):
+                graded_img = np.empty(frame.shape, np.uint8);
+            colour_lut.apply(frame, out=graded_img);
+        else:
+            graded_img = frame.copy();
+
+        # display image
+
+        cv2.imshow(windowName, frame);
+        cv2.imshow(windowName2, graded_img);
+
+        # stop timer and convert to ms. (to see how long processing and display takes)
+
+        stop_t = ((cv2.getTickCount() - start_t)/cv2.getTickFrequency()) * 1000;
+
+        # start the event loop - essential
+
+        # cv2.waitKey() is a keyboard binding function (argument is the time in milliseconds).
+        # It waits for specified milliseconds for any keyboard event.
+        # If you press any key in that time, the program continues.
+        # If 0 is passed, it waits indefinitely for a key stroke.
+        # (bitwise and with 0xFF to extract least significant byte of multi-byte response)
+
+        # here we use a wait time in ms. that takes account of processing time already used in the loop
+
+        key = cv2.waitKey(max(2, 40 - int(math.ceil(stop_t)))) & 0xFF; # wait 40ms (i.e. 1000ms / 25 fps = 40 ms)
+
+        # It can also be set to detect specific key strokes by recording which key is pressed
+
+        # e.g. if user presses "x" then exit
+
+        if (key == ord('x')):
+            keep_processing = False;
+        elif (key == ord('g')):
+            use_grading = not(use_grading);
+
+    # close all windows
+
+    cv2.destroyAllWindows()
+
+else:
+    print("No video file specified or camera connected.")
+
+#####################################################################
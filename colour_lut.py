@@ -0,0 +1,226 @@
+#####################################################################
+
+# Module : 3D colour look up tables (LUTs) - cross channel BGR -> BGR
+# mappings (e.g. colour grading), given as an N x N x N grid of output
+# colours (e.g. N = 33, or loaded from a .cube file) with trilinear
+# interpolation between the grid points
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import os
+import numpy as np
+import fft_backend
+from collections import OrderedDict
+
+#####################################################################
+
+# the position of each of the 256 possible 8-bit values of a channel within
+# the N points of the grid along its axis, as the index i of the grid point
+# below it (0 -> N - 2) and the fraction f of the way to the next one (so
+# that the interpolated output is (1 - f) grid[i] + f grid[i + 1])
+
+# domain_min / domain_max are the input values (0 -> 1) of the first and
+# last grid points - inputs outside of these are clamped to the edges
+
+def axis_weights(N, domain_min=0.0, domain_max=1.0):
+    position = (np.arange(256) / 255.0 - domain_min) * ((N - 1) / (domain_max - domain_min));
+    position = np.clip(position, 0, N - 1);
+    index = np.minimum(np.int32(position), N - 2);
+    return index, np.float32(position - index);
+
+#####################################################################
+
+# a 3D colour LUT - grid[b,g,r] is the output (B,G,R) colour, 0 -> 255, for
+# the input colour at grid point (b,g,r)
+
+# the output for every pixel of an image can be interpolated directly
+# from the grid (interpolate()), but as that takes 8 look ups and 7
+# interpolations per pixel it is slow for video - so instead the output
+# for all 256^3 possible input colours is computed once (bake(), ~ 0.25 s)
+# into a 64 MB table of packed BGR0 values, after which apply() takes a
+# single look up per pixel (~ 30 ms for a 1080p frame)
+
+# baking uses that trilinear interpolation is separable - the grid is
+# interpolated up to 256 points along the r axis, then the g axis, then
+# the b axis, giving exactly the same result as interpolating each colour
+# from the 8 grid points around it
+
+# e.g.
+#   lut = load_cube("grade.cube");
+#   graded = lut.apply(frame);
+
+class ColourLUT:
+
+    def __init__(self, grid, domain_min=(0.0, 0.0, 0.0), domain_max=(1.0, 1.0, 1.0)):
+        self.grid = np.float32(grid);
+        self.N = self.grid.shape[0];
+        self.weights = [axis_weights(self.N, domain_min[c], domain_max[c]) for c in range(3)];
+        self.table = None;
+
+    # interpolate the output for a (height x width x 3) 8-bit BGR image
+    # directly from the grid
+
+    def interpolate(self, image):
+        N = self.N;
+        grid = self.grid.reshape(-1, 3);
+        (ib, fb), (ig, fg), (ir, fr) = self.weights;
+        b, g, r = image[:,:,0], image[:,:,1], image[:,:,2];
+
+        base = ((ib * (N * N))[b] + (ig * N)[g] + ir[r]).ravel();
+        fb, fg, fr = fb[b].reshape(-1, 1), fg[g].reshape(-1, 1), fr[r].reshape(-1, 1);
+
+        def along_r(offset):
+            low = grid[base + offset];
+            return low + (grid[base + offset + 1] - low) * fr;
+        def along_g(offset):
+            low = along_r(offset);
+            return low + (along_r(offset + N) - low) * fg;
+        low = along_g(0);
+        output = low + (along_g(N * N) - low) * fb;
+
+        return np.uint8(np.clip(np.rint(output), 0, 255)).reshape(image.shape);
+
+    # compute the packed output for every possible input colour
+
+    def bake(self):
+        if self.table is not None:
+            return self.table;
+
+        def expand(values, axis, weights):
+            index, fraction = weights;
+            low = np.take(values, index, axis=axis);
+            high = np.take(values, index + 1, axis=axis);
+            shape = [1] * values.ndim;
+            shape[axis] = 256;
+            fraction = fraction.reshape(shape);
+            return low + (high - low) * fraction;
+
+        # interpolate along r and g once (256 x 256 per grid b), then along
+        # b one slab of b values at a time (to limit the memory used)
+
+        plane = expand(expand(self.grid, 2, self.weights[2]), 1, self.weights[1]);
+        table = np.empty((256, 256, 256, 4), np.uint8);
+        index, fraction = self.weights[0];
+
+        def bake_slab(b_values):
+            for b in b_values:
+                low = plane[index[b]];
+                colours = low + (plane[index[b] + 1] - low) * fraction[b];
+                table[b,:,:,0:3] = np.clip(np.rint(colours), 0, 255);
+                table[b,:,:,3] = 0;
+        fft_backend.map_chunks(bake_slab, np.arange(256));
+
+        self.table = table.view('<u4').reshape(-1);
+        return self.table;
+
+    # apply the LUT to a (height x width x 3) 8-bit BGR image, via the baked
+    # table (baking it first if needed) - with the rows of the image spread
+    # over the FFT threads (see fft_backend.set_threads())
+
+    def apply(self, image, out=None):
+        table = self.bake();
+        height, width = image.shape[:2];
+        if out is None:
+            out = np.empty((height, width, 3), np.uint8);
+
+        def apply_strip(rows):
+            strip = image[rows[0]:rows[-1] + 1];
+
+            # the index of each pixel in the table, b * 256^2 + g * 256 + r,
+            # is just its R,G,B,0 bytes read as one little-endian integer
+
+            zeros = np.zeros(strip.shape[:2], np.uint8);
+            index = cv2.merge([strip[:,:,2], strip[:,:,1], strip[:,:,0], zeros]).view('<u4')[:,:,0];
+            colours = np.take(table, index).view(np.uint8).reshape(strip.shape[0], width, 4);
+            cv2.cvtColor(colours, cv2.COLOR_BGRA2BGR, dst=out[rows[0]:rows[-1] + 1]);
+        fft_backend.map_chunks(apply_strip, np.arange(height));
+
+        return out;
+
+#####################################################################
+
+# the N x N x N identity grid - i.e. the input colour at each grid point
+
+def identity_grid(N=33):
+    values = np.linspace(0, 255, N, dtype=np.float32);
+    b, g, r = np.meshgrid(values, values, values, indexing='ij');
+    return np.stack((b, g, r), axis=-1);
+
+# create a LUT from a function mapping arrays of (B, G, R) colours, 0 ->
+# 255, to output colours - evaluated only at the N^3 grid points
+
+def create_colour_lut(function, N=33):
+    grid = identity_grid(N);
+    b, g, r = function(grid[...,0], grid[...,1], grid[...,2]);
+    return ColourLUT(np.stack((b, g, r), axis=-1));
+
+#####################################################################
+
+# load a 3D LUT from an (Adobe / Resolve) .cube file - a LUT_3D_SIZE N
+# line, optional DOMAIN_MIN / DOMAIN_MAX lines (as R G B) and then N^3
+# lines of R G B output values (0 -> 1) with R changing fastest - i.e.
+# already in [b,g,r] order
+
+# loaded LUTs (and so their baked tables, ~ 64MB each) are cached by
+# file until the file changes, when its entry is replaced - and only the
+# max_loaded_luts most recently used files are kept
+
+max_loaded_luts = 4;
+loaded_luts = OrderedDict(); # filename -> (modification time, LUT)
+
+def load_cube(filename):
+    filename = os.path.abspath(filename);
+    mtime = os.path.getmtime(filename);
+    loaded = loaded_luts.get(filename);
+    if (loaded is not None) and (loaded[0] == mtime):
+        loaded_luts.move_to_end(filename);
+        return loaded[1];
+
+    N = None;
+    domain_min = [0.0, 0.0, 0.0];
+    domain_max = [1.0, 1.0, 1.0];
+    values = [];
+
+    with open(filename) as cube_file:
+        for line in cube_file:
+            fields = line.split();
+            if not(fields) or fields[0].startswith("#"):
+                continue;
+            elif (fields[0] == "LUT_3D_SIZE"):
+                N = int(fields[1]);
+            elif (fields[0] == "DOMAIN_MIN"):
+                domain_min = [float(value) for value in fields[1:4]];
+            elif (fields[0] == "DOMAIN_MAX"):
+                domain_max = [float(value) for value in fields[1:4]];
+            elif (fields[0][0].isdigit() or (fields[0][0] in "-+.")):
+                values.append(fields[0:3]);
+
+    if N is None:
+        raise ValueError("not a 3D LUT .cube file (no LUT_3D_SIZE): " + filename);
+    if (len(values) != N * N * N):
+        raise ValueError("expected " + str(N * N * N) + " LUT entries, found "
+                         + str(len(values)) + ": " + filename);
+
+    # scale the RGB output values to 0 -> 255 and reverse them into BGR (the
+    # domain is also given as R G B, so is reversed likewise)
+
+    rgb = np.array(values, np.float32).reshape(N, N, N, 3);
+    grid = (rgb * 255.0)[...,::-1];
+
+    lut = ColourLUT(grid, domain_min[::-1], domain_max[::-1]);
+
+    loaded_luts.pop(filename, None);
+    loaded_luts[filename] = (mtime, lut);
+    while (len(loaded_luts) > max_loaded_luts):
+        loaded_luts.popitem(last=False);
+
+    return lut;
+
+#####################################################################
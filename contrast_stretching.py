@@ -13,29 +13,29 @@
 #####################################################################
 
 import cv2
-import numpy as np
+import math
 import sys
+from histogram_plot import HistogramPlot
+from histogram_tools import StreamingHistogram, channel_percentile_ranges, percentile_range, sampled_histogram
+from point_transforms import PointTransformChain, split_luminance, merge_luminance
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 0; # 0 if you have one camera, 1 or > 1 otherwise
 
-#####################################################################
+use_colour = False; # process the luminance of the colour image (toggle with "c")
+use_channels = False; # stretch each channel of the colour image separately (toggle with "p")
+use_streaming = False; # use a running histogram over the video (toggle with "s")
+sample_budget = 250000; # max. pixels sampled for each histogram (0 to use every pixel)
 
-# basic grayscale histogram drawing in raw OpenCV using lines
+#####################################################################
 
-# adapted from:
-# https://raw.githubusercontent.com/Itseez/opencv/master/samples/python2/hist.py
+# this function is called as a call-back everytime the trackbar is moved
+# (here we just do nothing)
 
-def hist_lines(hist):
-    h = np.ones((300,256,3)) * 255 # white background
-    cv2.normalize(hist,hist,0,255,cv2.NORM_MINMAX)
-    hist=np.int32(np.around(hist))
-    for x,y in enumerate(hist):
-        cv2.line(h,(x,0),(x,y),(0,0,0)) # black bars
-    y = np.flipud(h)
-    return y
+def nothing(x):
+    pass
 
 #####################################################################
 
@@ -63,6 +63,54 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     cv2.namedWindow(windowName3, cv2.WINDOW_NORMAL);
     cv2.namedWindow(windowName4, cv2.WINDOW_NORMAL);
 
+    # the histogram plots (each drawn into its own image, reused every frame)
+
+    input_plot = HistogramPlot();
+    output_plot = HistogramPlot();
+
+    # add track bar controllers for the percentage of pixels at each end of
+    # the histogram to ignore (i.e. saturate) when stretching, and for a
+    # gamma correction applied after the contrast stretch
+
+    percentile = 10; # 1% - 0 to stretch from the minimum to the maximum
+    cv2.createTrackbar("percentile (* 0.1)", windowName3, percentile, 100, nothing);
+
+    gamma = 100; # default gamma - no change
+    cv2.createTrackbar("gamma, (* 0.01)", windowName3, gamma, 500, nothing);
+
+    # and for an (optional) logarithmic transform applied after the gamma
+    # correction, scaled so that 255 still maps to 255
+
+    log_sigma = 0; # 0 - no logarithmic transform
+    cv2.createTrackbar("log sigma (* 0.01)", windowName3, log_sigma, 10, nothing);
+
+    # the contrast stretch followed by the gamma correction (and the
+    # logarithmic transform, a step added to / removed from the chain as
+    # its sigma is set / set to 0), as a chain of point transforms - these
+    # are combined into one look up table (only rebuilt when the stretch,
+    # gamma or log transform changes) so that the image is only processed
+    # in a single pass
+
+    chain = PointTransformChain();
+    chain.add("stretch", "contrast_stretch", low=0, high=255);
+    chain.add("gamma", "gamma_correction", gamma=1.0);
+
+    # and the same for stretching each (B, G, R) channel of the colour
+    # image separately, from its own histogram - with a stretch step for
+    # each channel, so the chain has a separate table for each channel
+    # (applied to all three by a single cv2.LUT())
+
+    channel_chain = PointTransformChain();
+    for channel in range(3):
+        channel_chain.add("stretch " + str(channel), "contrast_stretch", channel=channel, low=0, high=255);
+    channel_chain.add("gamma", "gamma_correction", gamma=1.0);
+
+    # a running histogram of the video (from every 4th pixel of every 4th
+    # row of each frame), from which the range to stretch is only updated
+    # when the distribution drifts
+
+    streaming = StreamingHistogram(alpha=0.1, stride=4, threshold=0.02);
+
     while (keep_processing):
 
         # if video file successfully open then read frame from video
@@ -70,27 +118,97 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
         if (cap.isOpened):
             ret, frame = cap.read();
 
-        # convert to grayscale
+        # perform basic contrast stretching
 
-        gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+        # map the low and high percentiles of the input to 0 and 255, then
+        # perform gamma correction (and any logarithmic transform) - all via
+        # a single look up table
 
-        # create an empty image of the same size for the output
+        # (the percentiles are read from the cumulative histogram, of each
+        # frame or the running histogram - which avoids the output
+        # flickering from frame to frame - and ignoring a small percentage
+        # of pixels stops a few outlying pixels setting the range)
 
-        output = np.empty(gray_img.shape, dtype=np.uint8);
+        # (for large images, the histograms are estimated from a sample of
+        # sample_budget pixels - see histogram_tools.py - which may miss the
+        # few most extreme pixels, so for a percentile of 0 the minimum and
+        # maximum are found exactly, as cv2.normalize() with
+        # norm_type=cv2.NORM_MINMAX does)
 
-        # perform basic contrast stretching
+        percentile = cv2.getTrackbarPos("percentile (* 0.1)", windowName3) * 0.1;
+        gamma = cv2.getTrackbarPos("gamma, (* 0.01)", windowName3) * 0.01;
+        log_sigma = cv2.getTrackbarPos("log sigma (* 0.01)", windowName3) * 0.01;
+
+        if (use_channels):
+
+            # stretch each channel of the colour image from its own
+            # histogram (the histogram displayed is that of all three)
+
+            input_img = frame;
+            ranges, hists = channel_percentile_ranges(frame, percentile, 100 - percentile, sample_budget);
+            hist = hists[0] + hists[1] + hists[2];
+            for channel, (minVal, maxVal) in enumerate(ranges):
+                channel_chain.set_parameters("stretch " + str(channel), low=minVal, high=maxVal);
+            current_chain = channel_chain;
+
+        else:
+
+            # convert to grayscale - or for colour, convert to YCrCb and
+            # process its luminance channel (Y) in place of the grayscale image
+
+            if (use_colour):
+                converted, input_img = split_luminance(frame);
+            else:
+                input_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+
+            hist, error = sampled_histogram(input_img, sample_budget);
+
+            if (use_streaming):
+                streaming.update(input_img);
+                minVal, maxVal = streaming.stretch_range(max(percentile, 0.01));
+            elif (percentile > 0):
+                minVal, maxVal = percentile_range(hist, percentile, 100 - percentile);
+            else:
+                minVal, maxVal = cv2.minMaxLoc(input_img)[:2];
+
+            chain.set_parameters("stretch", low=int(minVal), high=int(maxVal));
+            current_chain = chain;
+
+        current_chain.set_parameters("gamma", gamma=gamma);
+
+        if (log_sigma > 0):
+            log_C = 255 / math.log(1 + ((math.exp(log_sigma) - 1) * 255));
+            if ("log" in current_chain.steps):
+                current_chain.set_parameters("log", C=log_C, sigma=log_sigma);
+            else:
+                current_chain.add("log", "logarithmic", C=log_C, sigma=log_sigma);
+        elif ("log" in current_chain.steps):
+            current_chain.remove("log");
+
+        output = current_chain.apply(input_img);
+
+        # for luminance, put the processed luminance back and convert to BGR
+
+        if (use_colour and not(use_channels)):
+            output_img = merge_luminance(converted, output);
+        else:
+            output_img = output;
 
-        # cv2.normalize() with these parameters does
-        # basic constrast stretching
+        # the histogram of the output (of all three channels if stretched
+        # separately)
 
-        cv2.normalize(gray_img, output, alpha=0, beta=255, norm_type=cv2.NORM_MINMAX);
+        if (use_channels):
+            output_hist = sum(sampled_histogram(cv2.extractChannel(output, channel), sample_budget)[0]
+                              for channel in range(3));
+        else:
+            output_hist = sampled_histogram(output, sample_budget)[0];
 
         # display image
 
-        cv2.imshow(windowName1,gray_img);
-        cv2.imshow(windowName2,hist_lines(cv2.calcHist([gray_img],[0],None,[256],[0,256])));
-        cv2.imshow(windowName3,output);
-        cv2.imshow(windowName4,hist_lines(cv2.calcHist([output],[0],None,[256],[0,256])));
+        cv2.imshow(windowName1,frame if (use_colour or use_channels) else input_img);
+        cv2.imshow(windowName2,input_plot.bars(hist));
+        cv2.imshow(windowName3,output_img);
+        cv2.imshow(windowName4,output_plot.bars(output_hist));
 
         # start the event loop - essential
 
@@ -108,6 +226,12 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('c')):
+            use_colour = not(use_colour);
+        elif (key == ord('s')):
+            use_streaming = not(use_streaming);
+        elif (key == ord('p')):
+            use_channels = not(use_channels);
 
     # close all windows
 
@@ -0,0 +1,299 @@
+#####################################################################
+
+# Module : image convolution (filtering) that chooses between direct,
+# separable, box (running sum) and FFT (frequency domain) execution for
+# each image and kernel size, using a cost model calibrated on this
+# machine
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import math
+import numpy as np
+import fft_backend
+from fourier_filters import filter_cache
+
+#####################################################################
+
+# print each choice of method (when it changes) with its predicted and
+# measured cost
+
+verbose = False;
+
+#####################################################################
+
+# the methods - each filters an image with a (kernel_y x kernel_x)
+# separable kernel, given as its two 1D kernels, or a general 2D kernel
+# (kernel_x = 2D kernel, kernel_y = None) - as a correlation, as for
+# cv2.filter2D() (i.e. the same as convolution for symmetric kernels)
+
+# direct - each output pixel is a weighted sum over the whole kernel
+
+def filter_direct(image, kernel_x, kernel_y, border):
+    if kernel_y is None:
+        return cv2.filter2D(image, -1, kernel_x, borderType=border);
+    return cv2.filter2D(image, -1, np.outer(kernel_y, kernel_x), borderType=border);
+
+# separable - filter the rows with kernel_x then the columns with kernel_y
+
+def filter_separable(image, kernel_x, kernel_y, border):
+    return cv2.sepFilter2D(image, -1, kernel_x, kernel_y, borderType=border);
+
+# box - for a mean (box) kernel only, using running sums (so the cost per
+# pixel is independent of the kernel size)
+
+def filter_box(image, kernel_x, kernel_y, border):
+    return cv2.blur(image, (kernel_x.size, kernel_y.size), borderType=border);
+
+def is_box_kernel(kernel):
+    return (np.all(kernel == kernel.flat[0]) and (abs(np.sum(kernel) - 1) < 1e-6));
+
+# fft - extend the image borders by half the kernel size, then multiply
+# the (real) DFT of each channel by the DFT of the kernel (cached for each
+# kernel and DFT size) and take the inverse DFT of the product
+
+# as the DFT performs circular convolution the image is also zero padded
+# to at least (height + kernel height - 1) x (width + kernel width - 1),
+# so that no part of the output we keep wraps around, and the kernel is
+# flipped so that the result is a correlation
+
+def dft_size(height, width, kernel_height, kernel_width):
+    return (cv2.getOptimalDFTSize(height + kernel_height - 1),
+            cv2.getOptimalDFTSize(width + kernel_width - 1));
+
+def kernel_spectrum(kernel, dft_height, dft_width):
+    def build():
+        flipped = np.zeros((dft_height, dft_width), np.float32);
+        flipped[:kernel.shape[0],:kernel.shape[1]] = kernel[::-1,::-1];
+        return fft_backend.get_backend().rfft2(flipped);
+
+    key = ("kernel", kernel.shape, kernel.tobytes(), dft_height, dft_width);
+    return filter_cache.get(key, build);
+
+def filter_fft(image, kernel_x, kernel_y, border):
+    kernel = kernel_x if kernel_y is None else np.outer(kernel_y, kernel_x);
+    kernel = np.float32(kernel);
+    kernel_height, kernel_width = kernel.shape;
+    height, width = image.shape[:2];
+    dft_height, dft_width = dft_size(height, width, kernel_height, kernel_width);
+
+    # extend the borders (as the spatial methods would) and zero pad - with
+    # the kernel anchored at its centre, (kernel_width // 2, kernel_height //
+    # 2), as for cv2.filter2D() (so that even sized kernels match it too)
+
+    top = kernel_height // 2;
+    left = kernel_width // 2;
+    extended = cv2.copyMakeBorder(image, top, kernel_height - 1 - top, left, kernel_width - 1 - left, border);
+
+    channels = extended[:,:,np.newaxis] if (extended.ndim == 2) else extended;
+    padded = fft_backend.aligned_zeros((channels.shape[2], dft_height, dft_width));
+    padded[:, :extended.shape[0], :extended.shape[1]] = np.moveaxis(channels, 2, 0);
+
+    # filter all of the channels as one batch
+
+    backend = fft_backend.get_backend();
+    spectrum = backend.rfft2(padded);
+    spectrum *= kernel_spectrum(kernel, dft_height, dft_width);
+    filtered = backend.irfft2(spectrum, dft_width, dft_height);
+
+    # the output is then offset by the kernel size - convert it back to the
+    # type of the input, rounding and saturating as OpenCV does
+
+    filtered = np.moveaxis(filtered[:, kernel_height - 1:kernel_height - 1 + height,
+                                    kernel_width - 1:kernel_width - 1 + width], 0, 2);
+    if (image.ndim == 2):
+        filtered = filtered[:,:,0];
+    if (image.dtype == np.uint8):
+        return np.uint8(np.clip(np.rint(filtered), 0, 255));
+    return np.ascontiguousarray(filtered, image.dtype);
+
+methods = {
+    "direct" : filter_direct,
+    "separable" : filter_separable,
+    "box" : filter_box,
+    "fft" : filter_fft,
+};
+
+#####################################################################
+
+# the cost model - the work done by each method for a (height x width x
+# channels) image and (kernel_height x kernel_width) kernel, in
+# (arbitrary) units that each method's time is roughly proportional to
+
+# cv2.filter2D() itself switches to a DFT for kernels of dft_kernel_area
+# elements or more (for 8-bit or float32 images) - correlating the image
+# in blocks, each padded by the kernel size to a DFT of ~ 4.5 times the
+# kernel size (and at least 256) - so above this its work is that of
+# these block DFTs ("direct_dft", with its own cost per unit) rather than
+# a weighted sum over the kernel for each pixel
+
+dft_kernel_area = 130;
+
+def direct_method(kernel_height, kernel_width):
+    if ((kernel_height * kernel_width) >= dft_kernel_area):
+        return "direct_dft";
+    return "direct";
+
+def block_dft_size(kernel_size):
+    block = max(int(round(kernel_size * 4.5)), 256 - kernel_size + 1);
+    return cv2.getOptimalDFTSize(block + kernel_size - 1);
+
+def work(method, height, width, channels, kernel_height, kernel_width):
+    if (method == "direct"):
+        method = direct_method(kernel_height, kernel_width);
+    if (method == "direct"):
+        return height * width * channels * kernel_height * kernel_width;
+    elif (method == "direct_dft"):
+        dft_height, dft_width = block_dft_size(kernel_height), block_dft_size(kernel_width);
+        blocks = math.ceil(height / float(dft_height - kernel_height + 1)) * \
+                 math.ceil(width / float(dft_width - kernel_width + 1));
+        size = dft_height * dft_width;
+        return blocks * size * channels * math.log(size, 2);
+    elif (method == "separable"):
+        return height * width * channels * (kernel_height + kernel_width);
+    elif (method == "box"):
+        return height * width * channels;
+    dft_height, dft_width = dft_size(height, width, kernel_height, kernel_width);
+    size = dft_height * dft_width;
+    return size * channels * math.log(size, 2);
+
+# the time per unit of work (in seconds) for each method on this machine,
+# as measured by calibrate()
+
+cost_per_unit = {};
+
+# time each method on a test image (the best of repeats runs) to set the
+# cost per unit of work - this is called automatically on first use
+
+# (the direct method is timed for both a small kernel and one large enough
+# for cv2.filter2D() to use a DFT, dft_kernel_size)
+
+def calibrate(size=512, kernel_size=5, dft_kernel_size=15, repeats=3):
+    image = np.uint8(np.random.randint(0, 256, (size, size)));
+
+    timed = [(name, method, kernel_size) for name, method in methods.items()];
+    timed.append(("direct_dft", filter_direct, dft_kernel_size));
+
+    for name, method, ksize in timed:
+        kernel = cv2.getGaussianKernel(ksize, 0);
+        method(image, kernel, kernel, cv2.BORDER_REPLICATE); # warm up (and plan)
+        best = float("inf");
+        for i in range(repeats):
+            start_t = cv2.getTickCount();
+            method(image, kernel, kernel, cv2.BORDER_REPLICATE);
+            best = min(best, (cv2.getTickCount() - start_t) / cv2.getTickFrequency());
+        cost_per_unit[name] = best / work(name, size, size, 1, ksize, ksize);
+
+    return cost_per_unit;
+
+# predict the time (in seconds) that each method would take - separable is
+# only possible for a separable kernel, and box for a box kernel
+
+def predict(height, width, channels, kernel_height, kernel_width, separable=True, box=False):
+    if not(cost_per_unit):
+        calibrate();
+    possible = [name for name in methods if ((separable or (name != "separable")) and (box or (name != "box")))];
+    units = dict(cost_per_unit, direct=cost_per_unit[direct_method(kernel_height, kernel_width)]);
+    return dict((name, units[name] * work(name, height, width, channels, kernel_height, kernel_width))
+                for name in possible);
+
+#####################################################################
+
+# the last choice made for each image / kernel size (for logging changes)
+
+decisions = {};
+
+# filter an image with a separable kernel (kernel_x, kernel_y) or general
+# 2D kernel (kernel_x = 2D kernel, kernel_y = None) using whichever method
+# is predicted to be fastest (or that given as method)
+
+def filter_image(image, kernel_x, kernel_y=None, border=cv2.BORDER_DEFAULT, method=None):
+    height, width = image.shape[:2];
+    channels = 1 if (image.ndim == 2) else image.shape[2];
+    if kernel_y is None:
+        kernel_height, kernel_width = kernel_x.shape[:2];
+        box = False;
+    else:
+        kernel_height, kernel_width = kernel_y.size, kernel_x.size;
+        box = is_box_kernel(kernel_x) and is_box_kernel(kernel_y);
+
+    predicted = predict(height, width, channels, kernel_height, kernel_width, kernel_y is not None, box);
+    if method is None:
+        method = min(predicted, key=predicted.get);
+
+    start_t = cv2.getTickCount();
+    filtered = methods[method](image, kernel_x, kernel_y, border);
+    measured = (cv2.getTickCount() - start_t) / cv2.getTickFrequency();
+
+    key = (height, width, channels, kernel_height, kernel_width);
+    if (verbose and (decisions.get(key) != method)):
+        print("convolution: %dx%d kernel on %dx%dx%d image -> %s (predicted %.2f ms, measured %.2f ms; %s)" %
+              (kernel_width, kernel_height, width, height, channels, method, predicted[method] * 1000,
+               measured * 1000, ", ".join("%s %.2f ms" % (name, cost * 1000) for name, cost in predicted.items())));
+    decisions[key] = method;
+
+    return filtered;
+
+#####################################################################
+
+# the common smoothing filters (with the same parameters as the OpenCV
+# functions of the same name)
+
+# (kernel_size is (width, height) and a sigma <= 0 is calculated from the
+# kernel size, as for cv2.GaussianBlur())
+
+def GaussianBlur(image, kernel_size, sigmaX, sigmaY=0, border=cv2.BORDER_DEFAULT):
+    if (sigmaY <= 0):
+        sigmaY = sigmaX;
+    kernel_x = cv2.getGaussianKernel(kernel_size[0], sigmaX, cv2.CV_32F);
+    kernel_y = cv2.getGaussianKernel(kernel_size[1], sigmaY, cv2.CV_32F);
+    return filter_image(image, kernel_x, kernel_y, border);
+
+# mean filtering - an NxN kernel where each element has a weight of 1 / (N^2)
+
+def blur(image, kernel_size, border=cv2.BORDER_DEFAULT):
+    kernel_x = np.full((kernel_size[0], 1), 1.0 / kernel_size[0], np.float32);
+    kernel_y = np.full((kernel_size[1], 1), 1.0 / kernel_size[1], np.float32);
+    return filter_image(image, kernel_x, kernel_y, border);
+
+#####################################################################
+
+# check that every method gives the same output as cv2.filter2D() (to
+# within rounding) - for odd and even sized kernels, 2D and separable, on
+# grayscale and colour images - e.g. python convolution.py
+
+if __name__ == "__main__":
+    image = np.uint8(np.random.randint(0, 256, (97, 131, 3)));
+    for kernel_height, kernel_width in [(5, 5), (6, 6), (4, 7), (2, 2), (15, 15), (16, 12)]:
+        kernel_x = np.float32(np.random.rand(kernel_width, 1));
+        kernel_y = np.float32(np.random.rand(kernel_height, 1));
+        kernel_x, kernel_y = kernel_x / kernel_x.sum(), kernel_y / kernel_y.sum();
+        kernel = np.outer(kernel_y, kernel_x);
+
+        for test_image in (image, image[:,:,0]):
+            expected = np.int32(cv2.filter2D(test_image, -1, kernel));
+            for name, method in methods.items():
+                if (name == "box"):
+                    continue;
+                for kx, ky in ((kernel, None), (kernel_x, kernel_y)):
+                    if ((name == "separable") and (ky is None)):
+                        continue;
+                    difference = np.abs(np.int32(method(test_image, kx, ky, cv2.BORDER_DEFAULT)) - expected).max();
+                    assert difference <= 1, "%s differs from cv2.filter2D() by %d for a %dx%d kernel" % \
+                        (name, difference, kernel_width, kernel_height);
+
+        box_kernel = np.full((kernel_height, kernel_width), 1.0 / (kernel_height * kernel_width), np.float32);
+        expected = np.int32(cv2.filter2D(image, -1, box_kernel));
+        difference = np.abs(np.int32(filter_box(image, box_kernel[0], box_kernel[:,0], cv2.BORDER_DEFAULT)) - expected).max();
+        assert difference <= 1, "box differs from cv2.filter2D() by %d for a %dx%d kernel" % \
+            (difference, kernel_width, kernel_height);
+
+    print("all methods match cv2.filter2D()");
+
+#####################################################################
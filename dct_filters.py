@@ -0,0 +1,200 @@
+#####################################################################
+
+# Module : blockwise (JPEG style) DCT processing of whole images, with
+# per-coefficient masks or quantization tables, as used by the DCT
+# filtering example
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import numpy as np
+import fft_backend
+
+#####################################################################
+
+# the first K rows of the (orthonormal) N x N DCT-II matrix C, i.e. the
+# first K cosine basis functions of length N - cached per N (and extended
+# when a larger K is asked for)
+
+# the DCT of a block B is then C B C^T and its inverse C^T B C (as for
+# cv2.dct() / JPEG)
+
+dct_bases = {};
+
+def dct_basis(N, K):
+    basis = dct_bases.get(N);
+    if (basis is None) or (basis.shape[0] < K):
+        k = np.arange(K)[:,np.newaxis];
+        n = np.arange(N)[np.newaxis,:];
+        basis = np.sqrt(2.0 / N) * np.cos(np.pi * (2 * n + 1) * k / (2 * N));
+        basis[0,:] = np.sqrt(1.0 / N);
+        basis = dct_bases[N] = np.float32(basis);
+    return basis[:K];
+
+def dct_matrix(N):
+    return dct_basis(N, N);
+
+#####################################################################
+
+# pad an image (bottom / right, by replicating its edges as JPEG does) so
+# that its size is a multiple of the block size N
+
+def pad_to_blocks(image, N=8):
+    height, width = image.shape[:2];
+    return cv2.copyMakeBorder(image, 0, (-height) % N, 0, (-width) % N, cv2.BORDER_REPLICATE);
+
+# a (height / N x N x width / N x N) view of an image or coefficient array,
+# such that [i,:,j,:] is the N x N block at block row i, column j - as it
+# is a view, changes to it change the original array
+
+def block_view(image, N=8):
+    height, width = image.shape[:2];
+    return image.reshape(height // N, N, width // N, N);
+
+# the same as a (height / N x N x width) view - i.e. as strips of N rows
+
+def strip_view(image, N=8):
+    height, width = image.shape[:2];
+    return image.reshape(height // N, N, width);
+
+#####################################################################
+
+# the DCT of every N x N block of a (height x width) image at once, where
+# both dimensions are a multiple of N (see pad_to_blocks() above)
+
+# the result has the same layout as the image, with the N x N
+# co-efficients of each block in place of its pixels (as in JPEG)
+
+# this is performed as matrix products over strips of N rows rather than
+# per block - the rows of a strip, viewed as (N x width / N x N), are all
+# multiplied by right in one go, then the strip, viewed as (N x width), is
+# multiplied by left in place - with the strips spread over the FFT threads
+# (see fft_backend.set_threads())
+
+def transform_strips(image, left, right):
+    width = image.shape[1];
+    N = left.shape[0];
+    strips = strip_view(image, N);
+    def transform(batch):
+        rows = np.matmul(batch.reshape(-1, N), right);
+        np.matmul(left, rows.reshape(-1, N, width), out=batch);
+    fft_backend.map_chunks(lambda chunk: transform(strips[chunk[0]:chunk[-1] + 1]), np.arange(len(strips)));
+    return image;
+
+# shift is subtracted from the image first (e.g. 128, the JPEG level shift)
+
+def block_dct(image, N=8, shift=0):
+    C = dct_matrix(N);
+    coefficients = np.subtract(image, np.float32(shift), dtype=np.float32);
+    return transform_strips(coefficients, C, C.T);
+
+# the matching inverse - recovering the (height x width) image from the
+# block co-efficients (adding shift back on) - if in_place is set the
+# co-efficients are overwritten by the image
+
+def block_idct(coefficients, N=8, shift=0, in_place=False):
+    C = dct_matrix(N);
+    image = coefficients if in_place else np.float32(coefficients).copy();
+    transform_strips(image, C.T, C);
+    if (shift != 0):
+        image += np.float32(shift);
+    return image;
+
+#####################################################################
+
+# per-coefficient masks for N x N blocks - keep only those co-efficients
+# within radius of the top left (DC) co-efficient of each block
+
+block_masks = {};
+
+def block_low_pass_mask(N, radius):
+    if (N, radius) not in block_masks:
+        u = np.arange(N);
+        block_masks[(N, radius)] = np.float32(np.sqrt(u[:,np.newaxis] ** 2 + u[np.newaxis,:] ** 2) <= radius);
+    return block_masks[(N, radius)];
+
+# the JPEG standard (Annex K) luminance quantization table, scaled for a
+# quality of 1 -> 100 as per the IJG libjpeg implementation
+
+jpeg_luminance_table = np.array([
+    [16, 11, 10, 16, 24, 40, 51, 61],
+    [12, 12, 14, 19, 26, 58, 60, 55],
+    [14, 13, 16, 24, 40, 57, 69, 56],
+    [14, 17, 22, 29, 51, 87, 80, 62],
+    [18, 22, 37, 56, 68, 109, 103, 77],
+    [24, 35, 55, 64, 81, 104, 113, 92],
+    [49, 64, 78, 87, 103, 121, 120, 101],
+    [72, 92, 95, 98, 112, 100, 103, 99]], np.float32);
+
+quantization_tables = {};
+
+def jpeg_quantization_table(quality):
+    quality = min(max(1, quality), 100);
+    if quality not in quantization_tables:
+        scale = (5000.0 / quality) if (quality < 50) else (200.0 - (2 * quality));
+        table = np.floor(((jpeg_luminance_table * scale) + 50) / 100);
+        quantization_tables[quality] = np.clip(table, 1, 255).astype(np.float32);
+    return quantization_tables[quality];
+
+#####################################################################
+
+# an N x N table (mask or quantization) repeated across a row of blocks,
+# such that it broadcasts over the strip view of a co-efficient array of
+# the given width (which is much faster than broadcasting it over the
+# 4D block view)
+
+def tile_table(table, width):
+    return np.tile(np.float32(table), (1, width // table.shape[0]));
+
+# apply an N x N mask to (every block of) the co-efficients, in place
+
+def mask_blocks(coefficients, mask):
+    view = strip_view(coefficients, mask.shape[0]);
+    view *= tile_table(mask, coefficients.shape[1]);
+    return coefficients;
+
+# quantize (and then de-quantize) the co-efficients, in place, with an
+# N x N quantization table - i.e. round each to a multiple of its entry in
+# the table, as JPEG compression does
+
+def quantize_blocks(coefficients, table):
+    view = strip_view(coefficients, table.shape[0]);
+    view *= tile_table(1.0 / table, coefficients.shape[1]);
+    np.rint(view, out=view);
+    view *= tile_table(table, coefficients.shape[1]);
+    return coefficients;
+
+#####################################################################
+
+# the top left (rows x cols) corner of the DCT of a (height x width)
+# image, computed directly as C_height[:rows] image C_width[:cols]^T - for
+# when only that corner is needed (e.g. before low pass filtering with a
+# small radius) this costs O(height x width x rows) rather than a DCT of
+# the whole image
+
+def partial_dct(image, rows, cols):
+    height, width = image.shape[:2];
+    rows_transformed = np.matmul(dct_basis(height, rows), np.float32(image));
+    return np.matmul(rows_transformed, dct_basis(width, cols).T);
+
+# the inverse DCT of a (height x width) co-efficient array of which only
+# the top left (rows x cols) corner is non-zero, computed from that corner
+# alone - as C_height^T corner C_width, using just the first rows / cols
+# basis functions of each (see dct_basis() above)
+
+# this costs O(height x cols x (rows + width)), so for small corners (e.g.
+# low pass filtering with a small radius) it is much cheaper than an
+# inverse DCT of the whole array
+
+def partial_idct(corner, width, height):
+    rows, cols = corner.shape[:2];
+    columns = np.matmul(dct_basis(height, rows).T, np.float32(corner));
+    return np.matmul(columns, dct_basis(width, cols));
+
+#####################################################################
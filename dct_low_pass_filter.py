@@ -18,20 +18,29 @@ import cv2
 import sys
 import numpy as np
 import math
+from dct_filters import block_dct, block_idct, block_low_pass_mask, jpeg_quantization_table, mask_blocks, pad_to_blocks, partial_dct, partial_idct, quantize_blocks
+from fourier_filters import filter_cache
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 0; # 0 if you have one camera, 1 or > 1 otherwise
 
+use_blocks = False; # JPEG style N x N block DCT (toggled with the "b" key)
+block_size = 8;
+
 #####################################################################
 
 # create a simple low pass filter - DCT version (top left corner)
 
+# (cached, so it is only rebuilt when the size or radius changes)
+
 def create_low_pass_filter(width, height, radius):
-    lp_filter = np.zeros((height, width), np.float32);
-    cv2.circle(lp_filter, (0, 0), radius, (1,1,1), thickness=-1)
-    return lp_filter
+    def build():
+        lp_filter = np.zeros((height, width), np.float32);
+        cv2.circle(lp_filter, (0, 0), radius, (1,1,1), thickness=-1)
+        return lp_filter
+    return filter_cache.get(("dct_low_pass", width, height, radius), build);
 
 #####################################################################
 
@@ -100,6 +109,19 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     radius = 25;
     cv2.createTrackbar("radius", windowName2, radius, max(nheight,nwidth) * 2, nothing);
 
+    # and for the block DCT - the radius within each block, and the JPEG
+    # quality to quantize the blocks to (0 for no quantization)
+
+    block_radius = block_size;
+    cv2.createTrackbar("block radius", windowName2, block_radius, block_size * 2, nothing);
+    quality = 0;
+    cv2.createTrackbar("JPEG quality", windowName2, quality, 100, nothing);
+
+    # the (mostly zero) filtered co-efficients when only their corner is computed
+
+    corner_buffer = None;
+    last_corner = 0;
+
     while (keep_processing):
 
         # if video file successfully open then read frame from video
@@ -115,40 +137,85 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
-        # Performance of DCT calculation, via the DFT/FFT, is better for array sizes of power of two.
-        # Arrays whose size is a product of 2's, 3's, and 5's are also processed quite efficiently.
-        # Hence ee modify the size of the array tothe optimal size (by padding zeros) before finding DCT.
+        if (use_blocks):
+
+            # pad to a multiple of the block size, and perform the DCT of
+            # every block at once (level shifted by 128, as for JPEG)
+
+            nframe = pad_to_blocks(gray_frame, block_size);
+            dct = block_dct(nframe, block_size, 128);
 
-        pad_right = nwidth - width;
-        pad_bottom = nheight - hieght;
-        nframe = cv2.copyMakeBorder(gray_frame,0,pad_bottom,0,pad_right,cv2.BORDER_CONSTANT, value = 0);
+            # perform low pass filtering within each block and / or
+            # quantize each block as JPEG compression would
 
-        # perform the DCT
+            block_radius = cv2.getTrackbarPos("block radius",windowName2);
+            quality = cv2.getTrackbarPos("JPEG quality",windowName2);
 
-        dct = cv2.dct(np.float32(nframe));
+            dct_filtered = mask_blocks(dct, block_low_pass_mask(block_size, block_radius));
+            if (quality > 0):
+                dct_filtered = quantize_blocks(dct_filtered, jpeg_quantization_table(quality));
 
-        # perform low pass filtering
+            # recover the original image via the inverse DCT of each block
 
-        radius = cv2.getTrackbarPos("radius",windowName2);
-        lp_filter = create_low_pass_filter(nwidth, nheight, radius);
+            filtered_img = block_idct(dct_filtered, block_size, 128)[0:hieght,0:width];
 
-        dct_filtered = cv2.multiply(dct, lp_filter);
+        else:
 
-        # recover the original image via the inverse DCT
+            # Performance of DCT calculation, via the DFT/FFT, is better for array sizes of power of two.
+            # Arrays whose size is a product of 2's, 3's, and 5's are also processed quite efficiently.
+            # Hence ee modify the size of the array tothe optimal size (by padding zeros) before finding DCT.
 
-        filtered_img = cv2.dct(dct_filtered, flags = cv2.DCT_INVERSE);
+            pad_right = nwidth - width;
+            pad_bottom = nheight - hieght;
+            nframe = cv2.copyMakeBorder(gray_frame,0,pad_bottom,0,pad_right,cv2.BORDER_CONSTANT, value = 0);
+
+            # perform low pass filtering
+
+            radius = cv2.getTrackbarPos("radius",windowName2);
+            lp_filter = create_low_pass_filter(nwidth, nheight, radius);
+
+            # only the top left (radius + 1) x (radius + 1) corner of the
+            # co-efficients is retained by the filter - so when this is small
+            # compute just that corner of the DCT, and recover the original
+            # image via the inverse DCT of just that corner (with the rest of
+            # the co-efficients left as zero in an array reused every frame,
+            # only needed for display) - otherwise perform the DCT and
+            # inverse DCT of the whole array
+
+            corner = min(radius + 1, nheight, nwidth);
+
+            if ((corner * 4) <= min(nheight, nwidth)):
+                dct_corner = cv2.multiply(partial_dct(nframe, corner, corner), lp_filter[0:corner,0:corner]);
+                filtered_img = partial_idct(dct_corner, nwidth, nheight);
+
+                if (corner_buffer is None) or (corner_buffer.shape != (nheight, nwidth)):
+                    corner_buffer = np.zeros((nheight, nwidth), np.float32);
+                corner_buffer[0:last_corner,0:last_corner] = 0;
+                corner_buffer[0:corner,0:corner] = dct_corner;
+                last_corner = corner;
+                dct_filtered = corner_buffer;
+            else:
+                dct = cv2.dct(np.float32(nframe));
+                dct_filtered = cv2.multiply(dct, lp_filter);
+                filtered_img = cv2.dct(dct_filtered, flags = cv2.DCT_INVERSE);
 
         # normalized the filtered image into 0 -> 255 (8-bit grayscale) so we can see the output
 
+        # (at a radius of 0 only the DC co-efficient is kept, so the filtered
+        # image is flat - i.e. maxVal == minVal - and is shown as all zero)
+
         minVal, maxVal, minLoc, maxLoc = cv2.minMaxLoc(filtered_img);
-        filtered_img_normalized = filtered_img * (1.0/(maxVal-minVal)) + ((-minVal)/(maxVal-minVal));
-        filtered_img_normalized = np.uint8(filtered_img_normalized * 255);
+        if (maxVal > minVal):
+            filtered_img_normalized = filtered_img * (1.0/(maxVal-minVal)) + ((-minVal)/(maxVal-minVal));
+            filtered_img_normalized = np.uint8(filtered_img_normalized * 255);
+        else:
+            filtered_img_normalized = np.zeros(filtered_img.shape, np.uint8);
 
         # calculate the DCT spectrum for visualization
 
         # create a 8-bit image to put the magnitude spectrum into
 
-        dct_spectrum_normalized = np.zeros((nheight,nwidth,1), np.uint8);
+        dct_spectrum_normalized = np.zeros(dct_filtered.shape, np.uint8);
 
         # normalized the magnitude spectrum into 0 -> 255 (8-bit grayscale) so we can see the output
 
@@ -182,6 +249,8 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('b')):
+            use_blocks = not(use_blocks);
 
     # close all windows
 
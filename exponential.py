@@ -13,13 +13,15 @@
 #####################################################################
 
 import cv2
-import math
+from point_transforms import apply_transform, split_luminance, merge_luminance
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
 
+use_colour = False; # process the luminance of the colour image (toggle with "c")
+
 #####################################################################
 
 # this function is called as a call-back everytime the trackbar is moved
@@ -35,14 +37,14 @@ def nothing(x):
 # C - scaling constant
 # alpha - "gradient" co-efficient of exponential function
 
-def exponential_transform(I, C, alpha):
-    for i in range(0, I.shape[1]): # image width
-        for j in range(0, I.shape[0]): # image height
-
-            # compute exponential transform
+# as the output for each pixel depends only on its (8-bit) value, the
+# transform, int(C * (pow(1 + alpha, I) - 1)), is computed once for each
+# of the 256 possible values into a look up table (cached for each C and
+# alpha) and applied to the whole image via cv2.LUT()
+# (see point_transforms.py)
 
-            I[j,i] = int(C * (math.pow(1 + alpha, I[j,i]) - 1));
-    return I;
+def exponential_transform(I, C, alpha):
+    return apply_transform(I, "exponential", C=C, alpha=alpha);
 
 #####################################################################
 
@@ -80,24 +82,34 @@ if cap.open(camera_to_use):
         if (cap.isOpened):
             ret, frame = cap.read();
 
-        # convert to grayscale
+        # convert to grayscale - or for colour, convert to YCrCb and process
+        # its luminance channel (Y) in place of the grayscale image
 
-        gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+        if (use_colour):
+            converted, gray_img = split_luminance(frame);
+        else:
+            gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
         # get parameters from track bars
 
         constant = cv2.getTrackbarPos("constant, C", windowName2);
         alpha = cv2.getTrackbarPos("alpha (*0.001)", windowName2) * 0.001;
 
-        # make a copy and exp tranform it
+        # exp tranform it (into a new image)
+
+        exp_img = exponential_transform(gray_img, constant, alpha);
+
+        # for colour, put the processed luminance back and convert to BGR
 
-        exp_img = gray_img.copy();
-        exp_img = exponential_transform(exp_img, constant, alpha);
+        if (use_colour):
+            output_img = merge_luminance(converted, exp_img);
+        else:
+            output_img = exp_img;
 
         # display image
 
-        cv2.imshow(windowName, gray_img);
-        cv2.imshow(windowName2, exp_img);
+        cv2.imshow(windowName, frame if use_colour else gray_img);
+        cv2.imshow(windowName2, output_img);
 
         # start the event loop - essential
 
@@ -115,6 +127,8 @@ if cap.open(camera_to_use):
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('c')):
+            use_colour = not(use_colour);
 
     # close all windows
 
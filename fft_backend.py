@@ -0,0 +1,360 @@
+#####################################################################
+
+# Module : selectable FFT implementations (OpenCV, numpy or scipy) for
+# the real input DFTs used by the frequency domain filtering examples,
+# with thread control and an autotune whose choice is cached per shape
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import json
+import os
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# scipy is optional - its backend is only available if it is installed
+
+try:
+    import scipy.fft as scipy_fft
+except ImportError:
+    scipy_fft = None;
+
+#####################################################################
+
+# number of threads used by the transforms (see set_threads() below)
+
+fft_threads = os.cpu_count() or 1;
+
+#####################################################################
+
+# allocate an array whose data starts on an alignment byte boundary (so
+# SIMD code in the FFT implementations can use aligned loads / stores)
+
+def aligned_zeros(shape, dtype=np.float32, alignment=64):
+    dtype = np.dtype(dtype);
+    nbytes = int(np.prod(shape)) * dtype.itemsize;
+    raw = np.zeros(nbytes + alignment, np.uint8);
+    offset = (-raw.ctypes.data) % alignment;
+    return raw[offset:offset + nbytes].view(dtype).reshape(shape);
+
+#####################################################################
+
+# a pool of fft_threads threads, shared by everything here (and in the
+# other modules) that spreads its work over the FFT threads - created when
+# first needed and only recreated when set_threads() changes the number of
+# threads, so that the same threads (and so their per thread plans, see
+# below) are used from call to call
+
+thread_pool = None;
+
+def get_thread_pool():
+    global thread_pool;
+    if thread_pool is None:
+        thread_pool = ThreadPoolExecutor(fft_threads, thread_name_prefix="fft_backend");
+    return thread_pool;
+
+# call function on each of (up to fft_threads) chunks of values, spread
+# over the thread pool - or on all of them at once if there is only one
+# thread, or if called from one of the pool's own threads (which would
+# otherwise wait on work queued behind itself)
+
+def map_chunks(function, values):
+    if ((fft_threads <= 1) or (len(values) <= 1)
+        or threading.current_thread().name.startswith("fft_backend")):
+        function(values);
+    else:
+        chunks = np.array_split(values, min(fft_threads, len(values)));
+        list(get_thread_pool().map(function, chunks));
+
+# apply function to a (N x ...) batch in chunks spread over the thread
+# pool, writing the results into out
+
+def map_batch(function, batch, out):
+    def transform(chunk):
+        out[chunk[0]:chunk[-1] + 1] = function(batch[chunk[0]:chunk[-1] + 1]);
+    map_chunks(transform, np.arange(len(batch)));
+    return out;
+
+#####################################################################
+
+# the FFT backends - each provides the forward DFT of a real (height x
+# width) image, or (N x height x width) batch of them, returning the
+# non-redundant half of the spectrum as complex64 ((width // 2) + 1
+# columns) and the matching inverse DFT returning float32 images
+
+# anything a backend needs that depends only on the shape of the
+# transform is held in a plan, created once per shape and cached - plans
+# are per thread so the backends can be used from several threads at once
+# (e.g. for tiles)
+
+# (only the OpenCV backend needs one - numpy and scipy cache their own
+# internal FFT plans, and allocate their own output arrays, so hold
+# nothing here)
+
+class FFTBackend:
+
+    name = None;
+
+    def __init__(self):
+        self.local = threading.local();
+
+    def plan(self, shape):
+        plans = getattr(self.local, "plans", None);
+        if plans is None:
+            plans = self.local.plans = {};
+        plan = plans.get(shape);
+        if plan is None:
+            plan = plans[shape] = self.create_plan(shape);
+        return plan;
+
+    def create_plan(self, shape):
+        return None;
+
+#####################################################################
+
+# numpy.fft - single threaded, so batches are split over a thread pool
+
+# (numpy caches its own internal FFT plans so no plan is needed here)
+
+class NumpyFFT(FFTBackend):
+
+    name = "numpy";
+
+    def rfft2(self, images):
+        if (images.ndim == 2):
+            return np.fft.rfft2(images).astype(np.complex64, copy=False);
+        out = np.empty(images.shape[:-1] + ((images.shape[-1] // 2) + 1,), np.complex64);
+        return map_batch(lambda batch: np.fft.rfft2(batch, axes=(-2, -1)), images, out);
+
+    def irfft2(self, spectrum, width, height):
+        if (spectrum.ndim == 2):
+            return np.fft.irfft2(spectrum, s=(height, width)).astype(np.float32, copy=False);
+        out = np.empty(spectrum.shape[:-2] + (height, width), np.float32);
+        return map_batch(lambda batch: np.fft.irfft2(batch, s=(height, width), axes=(-2, -1)), spectrum, out);
+
+#####################################################################
+
+# scipy.fft - multi-threaded via its workers argument, and float32 input
+# is transformed in single precision
+
+# (scipy also caches its own internal FFT plans)
+
+class ScipyFFT(FFTBackend):
+
+    name = "scipy";
+
+    def rfft2(self, images):
+        spectrum = scipy_fft.rfft2(images, axes=(-2, -1), workers=fft_threads);
+        return spectrum.astype(np.complex64, copy=False);
+
+    def irfft2(self, spectrum, width, height):
+        images = scipy_fft.irfft2(spectrum, s=(height, width), axes=(-2, -1), workers=fft_threads);
+        return images.astype(np.float32, copy=False);
+
+#####################################################################
+
+# cv2.dft() - a real input is transformed in single precision into a
+# real (height x width) array holding the non-redundant half of the
+# spectrum in OpenCV's packed "CCS" format, which is ~ 4 times faster than
+# asking it for the complex (DFT_COMPLEX_OUTPUT) spectrum - and likewise
+# for the inverse DFT from a packed spectrum
+
+# in the packed format columns 1 -> 2k of each row hold the real and
+# imaginary parts of u = 1 -> k (k = (width - 1) // 2), i.e. already
+# interleaved as complex64, and columns 0 (and width - 1, for an even
+# width) hold the real valued u = 0 (and u = width / 2) columns of the
+# row DFTs after their own (packed) DFT down the column - so unpacking
+# is one block copy plus re-forming these one or two columns, using
+# F(u,-v) = conj(F(u,v)) for their lower half
+
+# the plan holds the rows of these packed columns and a work buffer for
+# packing the spectrum for the inverse DFT
+
+class OpenCVFFT(FFTBackend):
+
+    name = "opencv";
+
+    def create_plan(self, shape):
+        height, width = shape;
+        columns = [(0, 0)] + ([(width - 1, width // 2)] if ((width % 2) == 0) else []);
+        v = np.arange(1, ((height - 1) // 2) + 1);
+        return (columns, v, aligned_zeros((height, width)));
+
+    def unpack(self, packed, half):
+        height, width = packed.shape;
+        columns, v, work = self.plan((height, width));
+        k = (width - 1) // 2;
+        half.view(np.float32)[:, 2:2 + (2 * k)] = packed[:, 1:1 + (2 * k)];
+        for packed_column, column in columns:
+            values = packed[:, packed_column];
+            spectrum = half[:, column];
+            spectrum[0] = values[0];
+            spectrum.real[v] = values[(2 * v) - 1];
+            spectrum.imag[v] = values[2 * v];
+            spectrum[height - v] = np.conj(spectrum[v]);
+            if ((height % 2) == 0):
+                spectrum[height // 2] = values[height - 1];
+        return half;
+
+    def pack(self, half, width, height):
+        columns, v, packed = self.plan((height, width));
+        k = (width - 1) // 2;
+        packed[:, 1:1 + (2 * k)] = half.view(np.float32)[:, 2:2 + (2 * k)];
+        for packed_column, column in columns:
+            spectrum = half[:, column];
+            values = packed[:, packed_column];
+            values[0] = spectrum[0].real;
+            values[(2 * v) - 1] = spectrum.real[v];
+            values[2 * v] = spectrum.imag[v];
+            if ((height % 2) == 0):
+                values[height - 1] = spectrum[height // 2].real;
+        return packed;
+
+    # (for a batch, each image is transformed straight into its place in
+    # the output, with the packed spectrum in the plan's work buffer)
+
+    def rfft2(self, images, out=None):
+        images = np.asarray(images, np.float32);
+        if out is None:
+            out = np.empty(images.shape[:-1] + ((images.shape[-1] // 2) + 1,), np.complex64);
+        if (images.ndim > 2):
+            def transform(chunk):
+                for i in chunk:
+                    self.rfft2(images[i], out[i]);
+            map_chunks(transform, np.arange(len(images)));
+            return out;
+        work = self.plan(images.shape)[2];
+        return self.unpack(cv2.dft(images, dst=work), out);
+
+    def irfft2(self, spectrum, width, height, out=None):
+        spectrum = np.asarray(spectrum, np.complex64);
+        if out is None:
+            out = np.empty(spectrum.shape[:-2] + (height, width), np.float32);
+        if (spectrum.ndim > 2):
+            def transform(chunk):
+                for i in chunk:
+                    self.irfft2(spectrum[i], width, height, out[i]);
+            map_chunks(transform, np.arange(len(spectrum)));
+            return out;
+        return cv2.dft(self.pack(spectrum, width, height), dst=out, flags=cv2.DFT_INVERSE | cv2.DFT_SCALE);
+
+#####################################################################
+
+# the backends available on this machine, and the one currently in use
+# (OpenCV by default, as the fastest in single precision here, or as
+# chosen by set_backend() / autotune())
+
+backends = {"numpy" : NumpyFFT(), "opencv" : OpenCVFFT()};
+if scipy_fft is not None:
+    backends["scipy"] = ScipyFFT();
+
+current_backend = backends["opencv"];
+
+def get_backend():
+    return current_backend;
+
+def set_backend(name):
+    global current_backend;
+    if name not in backends:
+        raise ValueError("FFT backend not available: " + str(name));
+    current_backend = backends[name];
+    return current_backend;
+
+# set the number of threads used by all of the backends (including the
+# OpenCV thread pool)
+
+def set_threads(threads):
+    global fft_threads, thread_pool;
+    if (max(1, threads) != fft_threads) and (thread_pool is not None):
+        thread_pool.shutdown();
+        thread_pool = None;
+    fft_threads = max(1, threads);
+    cv2.setNumThreads(fft_threads);
+
+#####################################################################
+
+# time a forward + inverse DFT with each available backend, for images
+# (or batches of N images) of the given (padded) size, and select the
+# fastest - returns its name, the time taken by each backend in ms and
+# whether these were read from the cache (rather than measured now)
+
+# the result is cached for each size (and number of threads, backends and
+# library versions), in memory and in autotune_file, so that the
+# benchmark is only run the first time a size is seen on this machine -
+# rather than every time an example starts (pass retune = True to run it
+# again)
+
+# e.g.
+#   name, timings, cached = autotune(nwidth, nheight);
+#   print(autotune_summary(name, timings, cached));
+
+autotune_file = os.path.join(os.path.expanduser("~"), ".cache", "fft_backend_autotune.json");
+autotuned = None;
+
+def load_autotuned():
+    global autotuned;
+    if autotuned is None:
+        try:
+            with open(autotune_file) as cache_file:
+                autotuned = json.load(cache_file);
+        except (OSError, ValueError):
+            autotuned = {};
+    return autotuned;
+
+def save_autotuned():
+    try:
+        os.makedirs(os.path.dirname(autotune_file), exist_ok=True);
+        with open(autotune_file, "w") as cache_file:
+            json.dump(autotuned, cache_file, indent=1, sort_keys=True);
+    except OSError:
+        pass; # (the cache is only an optimization)
+
+def autotune(width, height, batch=1, repeats=3, retune=False):
+    key = "%dx%dx%d threads=%d %s opencv=%s numpy=%s" % (width, height, batch, fft_threads,
+                                                          ",".join(sorted(backends)), cv2.__version__,
+                                                          np.__version__);
+    cached = load_autotuned().get(key);
+    if (cached is not None) and (cached[0] in backends) and not(retune):
+        set_backend(cached[0]);
+        return current_backend.name, cached[1], True;
+
+    shape = (height, width) if batch == 1 else (batch, height, width);
+    images = aligned_zeros(shape);
+    images[...] = np.random.rand(*shape);
+
+    timings = {};
+    for name, backend in backends.items():
+        backend.irfft2(backend.rfft2(images), width, height); # warm up (and plan)
+        best = float("inf");
+        for i in range(repeats):
+            start_t = cv2.getTickCount();
+            backend.irfft2(backend.rfft2(images), width, height);
+            best = min(best, (cv2.getTickCount() - start_t) / cv2.getTickFrequency());
+        timings[name] = round(best * 1000, 3);
+
+    set_backend(min(timings, key=timings.get));
+    autotuned[key] = [current_backend.name, timings];
+    save_autotuned();
+    return current_backend.name, timings, False;
+
+# a one line report of the choice made by autotune() - so that a stale
+# cached choice (e.g. after a change the cache key does not capture) is
+# visible, and can be re-benchmarked
+
+def autotune_summary(name, timings, cached):
+    others = ", ".join(other + " " + str(timings[other]) + " ms" for other in sorted(timings) if other != name);
+    if (cached):
+        source = "cached in " + autotune_file + " - pass retune=True to autotune() to re-benchmark";
+    else:
+        source = "benchmarked now";
+    return ("FFT backend : " + name + " (" + str(timings[name]) + " ms per forward + inverse DFT"
+            + ((", against " + others) if others else "") + ") - " + source);
+
+#####################################################################
@@ -18,12 +18,20 @@ import cv2
 import sys
 import numpy as np
 import math
+from fft_backend import autotune, autotune_summary
+from fourier_filters import FrequencyFilterBank, NotchFilter, SpectrumView
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
 
+use_real_dft = True; # filter only the half spectrum of the (real) input
+spectrum_size = 512; # maximum size of the (low resolution) spectrum display
+
+use_notch = False; # automatically notch filter out periodic noise (toggle with "n")
+notch_interval = 25; # frames between searches of the spectrum for noise peaks
+
 #####################################################################
 
 # define video capture object
@@ -34,6 +42,7 @@ cap = cv2.VideoCapture();
 
 windowName = "Live Camera Input"; # window name
 windowName2 = "Fourier Magnitude Spectrum"; # window name
+windowName3 = "Notch Filtered Image"; # window name
 
 
 # if command line arguments are provided try to read video_name
@@ -46,6 +55,7 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
     cv2.namedWindow(windowName, cv2.WINDOW_NORMAL);
     cv2.namedWindow(windowName2, cv2.WINDOW_NORMAL);
+    cv2.namedWindow(windowName3, cv2.WINDOW_NORMAL);
 
     # if video file successfully open then read frame from video
 
@@ -62,6 +72,32 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     nhieght = cv2.getOptimalDFTSize(hieght);
     nwidth = cv2.getOptimalDFTSize(width);
 
+    # Performance of DFT calculation, via the FFT, is better for array sizes of power of two.
+    # Arrays whose size is a product of 2's, 3's, and 5's are also processed quite efficiently.
+    # Hence the filter bank zero pads each image to this optimal size before finding the DFT
+    # (here we only use it for the forward DFT, plus the notch filter below).
+
+    filter_bank = FrequencyFilterBank(nwidth, nhieght, half_spectrum=use_real_dft);
+
+    # the low resolution view of the spectrum used for display
+
+    spectrum_view = SpectrumView(nwidth, nhieght, max_size=spectrum_size);
+
+    # the notch filter - this finds peaks in the spectrum away from the zero-frequency, F(0,0),
+    # DC component (as caused by periodic noise) and caches a filter removing them, only
+    # searching for them again every notch_interval frames or if the energy at the peaks changes
+
+    notch_filter = NotchFilter(nwidth, nhieght, half_spectrum=use_real_dft, interval=notch_interval);
+    notch_peaks = [];
+
+    # pick the fastest of the available FFT implementations on this machine for this DFT size
+    # - this is only benchmarked the first time, after which the choice is read back from a
+    # cache (see fft_backend.autotune()) - and report the choice
+
+    if (use_real_dft):
+        name, timings, cached = autotune(nwidth, nhieght);
+        print(autotune_summary(name, timings, cached));
+
     while (keep_processing):
 
         # if video file successfully open then read frame from video
@@ -77,38 +113,37 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
-        # Performance of DFT calculation, via the FFT, is better for array sizes of power of two.
-        # Arrays whose size is a product of 2's, 3's, and 5's are also processed quite efficiently.
-        # Hence ee modify the size of the array tothe optimal size (by padding zeros) before finding DFT.
-
-        pad_right = nwidth - width;
-        pad_bottom = nhieght - hieght;
-        nframe = cv2.copyMakeBorder(gray_frame,0,pad_bottom,0,pad_right,cv2.BORDER_CONSTANT, value = 0);
-
-        # perform the DFT and get complex output
-
-        dft = cv2.dft(np.float32(nframe),flags = cv2.DFT_COMPLEX_OUTPUT);
-
-        # shift it so that we the zero-frequency, F(0,0), DC component to the center of the spectrum.
+        # perform the DFT (of the zero padded image)
 
-        dft_shifted = np.fft.fftshift(dft);
+        filter_bank.forward(gray_frame);
 
-        # calculate the magnitude spectrum and log transform + scale it for visualization
+        # display images
 
-        magnitude_spectrum = np.log(cv2.magnitude(dft_shifted[:,:,0],dft_shifted[:,:,1]));
+        cv2.imshow(windowName,gray_frame);
 
-        # create a 8-bit image to put the magnitude spectrum into
+        # if notch filtering then remove the peaks from the spectrum and recover the filtered
+        # image via the inverse DFT
 
-        magnitude_spectrum_normalized = np.zeros((nhieght,nwidth,1), np.uint8);
+        if (use_notch):
+            filtered_img = filter_bank.apply_mask(notch_filter.update(filter_bank.spectrum));
+            cv2.imshow(windowName3,np.uint8(np.clip(filtered_img[0:hieght,0:width], 0, 255)));
 
-        # normalized the magnitude spectrum into 0 -> 255 (8-bit grayscale) so we can see the output
+            if (notch_filter.peaks != notch_peaks):
+                notch_peaks = notch_filter.peaks;
+                print("Notch filtering peaks (u, v) at: " + str(notch_peaks));
 
-        cv2.normalize(np.uint8(magnitude_spectrum), magnitude_spectrum_normalized, alpha=0, beta=255, norm_type=cv2.NORM_MINMAX);
+        # calculate the magnitude spectrum then log transform + scale it for visualization - only
+        # when its window is visible, and then only at a low resolution, sampling it directly in
+        # the shifted order so that the zero-frequency, F(0,0), DC component is at the center of
+        # the spectrum (see fourier_filters.SpectrumView)
 
-        # display images
+        # (when notch filtering we display the filtered spectrum)
 
-        cv2.imshow(windowName,gray_frame);
-        cv2.imshow(windowName2,magnitude_spectrum_normalized);
+        if (cv2.getWindowProperty(windowName2, cv2.WND_PROP_VISIBLE) >= 1):
+            if (use_notch):
+                cv2.imshow(windowName2,spectrum_view.render(filter_bank.filtered));
+            else:
+                cv2.imshow(windowName2,filter_bank.render_spectrum(spectrum_view));
 
         # stop timer and convert to ms. (to see how long processing and display takes)
 
@@ -128,10 +163,12 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         # It can also be set to detect specific key strokes by recording which key is pressed
 
-        # e.g. if user presses "x" then exit
+        # e.g. if user presses "x" then exit, or "n" to toggle notch filtering
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('n')):
+            use_notch = not(use_notch);
 
     # close all windows
 
@@ -0,0 +1,964 @@
+#####################################################################
+
+# Module : construction (and caching) of the fourier space filters
+# shared by the frequency domain filtering examples
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import math
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import fft_backend
+
+#####################################################################
+
+# a least recently used (LRU) cache of filter masks with bounded memory
+
+# masks are stored read-only (as they are shared between callers) and
+# the oldest are evicted first once max_bytes is exceeded - the most
+# recent mask is always kept even if it alone is over the limit
+
+class FilterCache:
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes;
+        self.current_bytes = 0;
+        self.masks = OrderedDict();
+
+    def get(self, key, build):
+        mask = self.masks.get(key);
+        if mask is not None:
+            self.masks.move_to_end(key);
+            return mask;
+
+        mask = build();
+        mask.flags.writeable = False;
+        self.masks[key] = mask;
+        self.current_bytes += mask.nbytes;
+
+        while (self.current_bytes > self.max_bytes) and (len(self.masks) > 1):
+            _, old_mask = self.masks.popitem(last=False);
+            self.current_bytes -= old_mask.nbytes;
+
+        return mask;
+
+    def clear(self):
+        self.masks.clear();
+        self.current_bytes = 0;
+
+# shared cache used by all of the filter construction functions below
+
+filter_cache = FilterCache();
+
+#####################################################################
+
+# compute the radial distance from the zero-frequency, F(0,0), component
+# for each element of a (width x height) spectrum
+
+# this is in the natural (unshifted) quadrant ordering of the DFT output,
+# so filters built from it are applied without any np.fft.fftshift(), and
+# is either for the full spectrum (as returned by cv2.dft()) or, for
+# half_spectrum = True, for the non-redundant half of the spectrum of a
+# real input (as returned by real_dft() below) with (width // 2) + 1
+# columns
+
+# the distance map is computed once per (padded) spectrum size and shared,
+# via the filter cache, by all of the radial filters - so e.g. an ideal
+# filter for a new radius is just a comparison against it
+
+def spectrum_radius(width, height, half_spectrum=False):
+    def build():
+        if (half_spectrum):
+            x = np.arange((width // 2) + 1);
+        else:
+            x = np.fft.fftfreq(width, 1.0 / width); # 0, 1, ..., -2, -1
+        y = np.fft.fftfreq(height, 1.0 / height);
+        return np.float32(np.sqrt(x[np.newaxis,:] ** 2 + y[:,np.newaxis] ** 2));
+
+    return filter_cache.get(("radius", width, height, half_spectrum), build);
+
+# an index of the same distances as integer radius labels - the smallest
+# integer radius r for which each element is within distance <= r (and so
+# is passed by an ideal low pass filter of radius r)
+
+def spectrum_radius_index(width, height, half_spectrum=False):
+    def build():
+        return np.int32(np.ceil(spectrum_radius(width, height, half_spectrum))).ravel();
+
+    return filter_cache.get(("radius_index", width, height, half_spectrum), build);
+
+# the number of elements of the full spectrum that each element of the
+# half spectrum stands for - 2 for the columns whose (conjugate) mirror
+# image is omitted, 1 for column 0 (and column width / 2 if width is even)
+
+def half_spectrum_weights(width):
+    weights = np.full((width // 2) + 1, 2, np.float32);
+    weights[0] = 1;
+    if ((width % 2) == 0):
+        weights[-1] = 1;
+    return weights;
+
+#####################################################################
+
+# the fraction of the total energy (squared magnitude) of a (width x
+# height) spectrum, in the same form as for spectrum_radius(), that lies
+# within each integer radius of F(0,0) - i.e. energy[r] is the fraction of
+# the energy passed by an ideal low pass filter of radius r (and 1 -
+# energy[r] that passed by the high pass filter of radius r)
+
+# this is computed for all radii in one pass over the spectrum, by summing
+# the energy for each label of the radius index and taking the cumulative
+# sum of these totals
+
+def radial_energy(spectrum, width, height, half_spectrum=False):
+    if (half_spectrum):
+        energy = np.square(spectrum.real) + np.square(spectrum.imag);
+        energy *= half_spectrum_weights(width);
+    else:
+        energy = np.square(spectrum[:,:,0]) + np.square(spectrum[:,:,1]);
+    totals = np.cumsum(np.bincount(spectrum_radius_index(width, height, half_spectrum),
+                                   weights=energy.ravel()));
+    return totals / max(totals[-1], np.finfo(np.float64).tiny);
+
+#####################################################################
+
+# convert a real valued filter response to the form used to apply it
+
+# the half spectrum is complex valued so the response can be applied by a
+# simple (broadcast) multiplication, otherwise duplicate the response into
+# both the real and imaginary channels so that an element-wise
+# cv2.multiply() scales both parts of the (2 channel) cv2.dft() output
+
+# (N.B. not cv2.mulSpectrums(), which would treat the duplicated response
+# as the complex value r + ir and so also rotate the phase by 45 degrees)
+
+def spectrum_filter(response, half_spectrum=False):
+    response = np.float32(response);
+    if (half_spectrum):
+        return response;
+    return np.repeat(response[:,:,np.newaxis], 2, axis=2);
+
+#####################################################################
+
+# the radial responses of the filters as functions of the distance of
+# each element of the spectrum from F(0,0) (see spectrum_radius() above)
+
+# simple (ideal) low / high pass filters, or a band pass filter passing
+# inner_radius < distance <= outer_radius
+
+def low_pass_response(distance, radius):
+    return distance <= radius;
+
+def high_pass_response(distance, radius):
+    return distance > radius;
+
+def band_pass_response(distance, inner_radius, outer_radius):
+    return (distance > inner_radius) & (distance <= outer_radius);
+
+# butterworth low / high pass filters of order n
+
+# based on the forumla in lecture 8 (2015 version)
+# see also HIPR2 on-line
+
+# (D = 0 is allowed, from the trackbar, and gives the limiting response)
+
+def butterworth_low_pass_response(distance, D, n):
+    with np.errstate(divide='ignore', over='ignore'):
+        return 1 / (1 + np.power(np.maximum(1, distance) / D, 2 * n));
+
+def butterworth_high_pass_response(distance, D, n):
+    with np.errstate(divide='ignore', over='ignore'):
+        return 1 / (1 + np.power(D / np.maximum(1, distance), 2 * n));
+
+# gaussian low / high pass filters with standard deviation D
+
+# (again D = 0 is allowed and gives the limiting response)
+
+def gaussian_low_pass_response(distance, D):
+    with np.errstate(over='ignore'):
+        return np.exp(-np.square(distance) / max(2.0 * D * D, np.finfo(np.float32).tiny));
+
+def gaussian_high_pass_response(distance, D):
+    return 1 - gaussian_low_pass_response(distance, D);
+
+# the filters available by kind
+
+filter_kinds = {
+    "low_pass" : low_pass_response,
+    "high_pass" : high_pass_response,
+    "band_pass" : band_pass_response,
+    "butterworth_low_pass" : butterworth_low_pass_response,
+    "butterworth_high_pass" : butterworth_high_pass_response,
+    "gaussian_low_pass" : gaussian_low_pass_response,
+    "gaussian_high_pass" : gaussian_high_pass_response,
+};
+
+#####################################################################
+
+# band pass / band reject filters, passing (or rejecting) inner_radius <
+# distance <= outer_radius, made from a low pass filter of the same family
+# at outer_radius and a high pass filter at inner_radius (any other
+# parameters, e.g. the butterworth order n, are passed to both)
+
+# kind : (low pass kind, high pass kind, name of their radius parameter,
+#         band reject)
+
+band_filters = {
+    "band_reject" : ("low_pass", "high_pass", "radius", True),
+    "butterworth_band_pass" : ("butterworth_low_pass", "butterworth_high_pass", "D", False),
+    "butterworth_band_reject" : ("butterworth_low_pass", "butterworth_high_pass", "D", True),
+    "gaussian_band_pass" : ("gaussian_low_pass", "gaussian_high_pass", "D", False),
+    "gaussian_band_reject" : ("gaussian_low_pass", "gaussian_high_pass", "D", True),
+};
+
+# the band pass response is the product of the low and high pass
+# responses, and band reject is one minus this
+
+def band_response(low, high, radius, reject, distance, inner_radius, outer_radius, **parameters):
+    passed = filter_kinds[low](distance, **dict(parameters, **{radius : outer_radius}));
+    passed = passed * filter_kinds[high](distance, **dict(parameters, **{radius : inner_radius}));
+    return (1 - passed) if reject else passed;
+
+def band_filter_kind(low, high, radius, reject):
+    return lambda distance, **parameters: band_response(low, high, radius, reject, distance, **parameters);
+
+filter_kinds.update((kind, band_filter_kind(*band)) for kind, band in band_filters.items());
+
+#####################################################################
+
+# create (or fetch from the cache) a filter of a given kind for a
+# (width x height) spectrum, e.g.
+#   create_filter("butterworth_low_pass", nwidth, nheight, D=25, n=2);
+
+def create_filter(kind, width, height, half_spectrum=False, **parameters):
+    if kind not in filter_kinds:
+        raise ValueError("unknown filter kind: " + str(kind));
+
+    def build():
+        distance = spectrum_radius(width, height, half_spectrum);
+        return spectrum_filter(filter_kinds[kind](distance, **parameters), half_spectrum);
+
+    # band filters are instead built from the (cached) low and high pass
+    # filters, so e.g. moving only one edge of the band reuses the other
+
+    def build_band():
+        low, high, radius, reject = band_filters[kind];
+        others = dict(parameters);
+        inner_radius = others.pop("inner_radius");
+        outer_radius = others.pop("outer_radius");
+        passed = np.multiply(create_filter(low, width, height, half_spectrum, **dict(others, **{radius : outer_radius})),
+                             create_filter(high, width, height, half_spectrum, **dict(others, **{radius : inner_radius})));
+        if (reject):
+            np.subtract(1, passed, out=passed);
+        return passed;
+
+    key = (kind, width, height, half_spectrum) + tuple(sorted(parameters.items()));
+    return filter_cache.get(key, build_band if kind in band_filters else build);
+
+# (and the same for each kind of filter by name)
+
+def create_low_pass_filter(width, height, radius, half_spectrum=False):
+    return create_filter("low_pass", width, height, half_spectrum, radius=radius);
+
+def create_high_pass_filter(width, height, radius, half_spectrum=False):
+    return create_filter("high_pass", width, height, half_spectrum, radius=radius);
+
+def create_band_pass_filter(width, height, inner_radius, outer_radius, half_spectrum=False):
+    return create_filter("band_pass", width, height, half_spectrum,
+                         inner_radius=inner_radius, outer_radius=outer_radius);
+
+def create_butterworth_low_pass_filter(width, height, D, n, half_spectrum=False):
+    return create_filter("butterworth_low_pass", width, height, half_spectrum, D=D, n=n);
+
+def create_butterworth_high_pass_filter(width, height, D, n, half_spectrum=False):
+    return create_filter("butterworth_high_pass", width, height, half_spectrum, D=D, n=n);
+
+def create_gaussian_low_pass_filter(width, height, D, half_spectrum=False):
+    return create_filter("gaussian_low_pass", width, height, half_spectrum, D=D);
+
+def create_gaussian_high_pass_filter(width, height, D, half_spectrum=False):
+    return create_filter("gaussian_high_pass", width, height, half_spectrum, D=D);
+
+#####################################################################
+
+# forward DFT of a real (grayscale) image returning only the non-redundant
+# half of its spectrum - as the input is real, F(-u,-v) = conj(F(u,v)),
+# so the remaining columns carry no extra information
+
+# the image is zero padded (bottom / right) to (width x height) if needed
+# and the transform is performed by the current FFT backend (see
+# fft_backend.py - OpenCV by default, numpy or scipy) in single precision
+
+def real_dft(image, width, height):
+    image = np.asarray(image, np.float32);
+    if (image.shape != (height, width)):
+        padded = np.zeros((height, width), np.float32);
+        padded[:image.shape[0],:image.shape[1]] = image;
+        image = padded;
+    return fft_backend.get_backend().rfft2(image);
+
+# matching inverse DFT - returns the real (width x height) image
+
+def inverse_real_dft(spectrum, width, height):
+    return fft_backend.get_backend().irfft2(spectrum, width, height);
+
+#####################################################################
+
+# batch versions of real_dft() / inverse_real_dft() for a contiguous
+# (N x height x width) stack of (already zero padded) images, transformed
+# in one vectorized call spread over fft_backend.fft_threads threads
+
+def real_dft_batch(batch):
+    return fft_backend.get_backend().rfft2(batch);
+
+def inverse_real_dft_batch(spectrum, width, height):
+    return fft_backend.get_backend().irfft2(spectrum, width, height);
+
+#####################################################################
+
+# expand a real valued half spectrum array (e.g. a magnitude spectrum or
+# a half_spectrum filter) to the full (width x height) spectrum, in
+# natural (unshifted) order, using the symmetry |F(-u,-v)| = |F(u,v)|
+
+# (only needed for display purposes)
+
+def expand_half_spectrum(half, width):
+    height = half.shape[0];
+    full = np.empty((height, width), half.dtype);
+    full[:,:half.shape[1]] = half;
+    rows = (-np.arange(height)) % height;
+    cols = width - np.arange(half.shape[1], width);
+    full[:,half.shape[1]:] = half[rows][:,cols];
+    return full;
+
+#####################################################################
+
+# normalize a (filtered) image into 0 -> 255 (8-bit grayscale) so we can
+# see the output
+
+def normalize_image(image):
+    return cv2.normalize(image, None, alpha=0, beta=255, norm_type=cv2.NORM_MINMAX, dtype=cv2.CV_8U);
+
+#####################################################################
+
+# a low resolution preview of a (width x height) spectrum for display,
+# already shifted so that F(0,0) is at its center
+
+# rather than computing the magnitude of the whole spectrum, shifting it
+# and then scaling it down, only every step-th frequency (in each
+# direction) of the shifted spectrum is sampled - so that the preview is at
+# most max_size pixels across - by indexing the spectrum directly, in
+# natural DFT order (and via F(-u,-v) = conj(F(u,v)) for the omitted half
+# of a half spectrum)
+
+# the log magnitude is then calculated in place in a float32 buffer and
+# scaled into a uint8 image, both of which are reused from frame to frame
+
+# (either the half spectrum of a real input or the full 2 channel output
+# of cv2.dft() can be rendered, see render() below)
+
+# e.g.
+#   view = SpectrumView(nwidth, nheight);
+#   cv2.imshow(window_name, view.render(bank.spectrum));
+
+class SpectrumView:
+
+    def __init__(self, width, height, max_size=256):
+        self.width = width;
+        self.height = height;
+        self.step = max(1, int(math.ceil(max(width, height) / float(max_size))));
+
+        # the (shifted) frequencies sampled by each pixel of the preview, and
+        # where these are in the full and half spectrum
+
+        u = np.int32(np.fft.fftshift(np.fft.fftfreq(width, 1.0 / width)))[::self.step];
+        v = np.int32(np.fft.fftshift(np.fft.fftfreq(height, 1.0 / height)))[::self.step];
+        u, v = np.meshgrid(u, v);
+
+        self.rows = v % height;
+        self.cols = u % width;
+        self.half_rows = np.where(u < 0, -v, v) % height;
+        self.half_cols = np.abs(u);
+
+        self.magnitude = np.zeros(self.rows.shape, np.float32);
+        self.image = np.zeros(self.rows.shape, np.uint8);
+        self.filter_image = np.zeros(self.rows.shape, np.uint8);
+
+    # render the log magnitude of a spectrum - either a (complex) half
+    # spectrum, a (C x ...) stack of them (averaged over C, e.g. the channels
+    # of a colour image) or the 2 channel output of cv2.dft()
+
+    def render(self, spectrum):
+        if (not(np.iscomplexobj(spectrum)) and (spectrum.ndim == 3)):
+            samples = spectrum[self.rows, self.cols];
+            np.hypot(samples[:,:,0], samples[:,:,1], out=self.magnitude);
+        elif (spectrum.ndim == 3):
+            np.mean(np.abs(spectrum[:, self.half_rows, self.half_cols]), axis=0, out=self.magnitude);
+        else:
+            np.abs(spectrum[self.half_rows, self.half_cols], out=self.magnitude);
+
+        np.log1p(self.magnitude, out=self.magnitude);
+        cv2.normalize(self.magnitude, self.image, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U);
+        return self.image;
+
+    # render a filter (as returned by create_filter()) in the same way,
+    # scaling its 0 -> 1 response to 0 -> 255
+
+    def render_filter(self, mask):
+        if (mask.ndim == 3):
+            samples = mask[self.rows, self.cols, 0];
+        else:
+            samples = mask[self.half_rows, self.half_cols];
+        np.multiply(samples, 255, out=self.magnitude);
+        self.filter_image[...] = self.magnitude;
+        return self.filter_image;
+
+#####################################################################
+
+# a bank of named frequency domain filters applied to the same image
+
+# the forward DFT of each image is computed once (by forward()) and then
+# any number of the registered filters are applied to that spectrum (by
+# apply()) - all of the filters share the padded input and filtered
+# spectrum buffers, and their masks come from the shared filter cache
+
+# e.g.
+#   bank = FrequencyFilterBank(nwidth, nheight);
+#   bank.add_filter("low", "low_pass", radius=25);
+#   bank.add_filter("butterworth", "butterworth_low_pass", D=25, n=2);
+#   outputs = bank.process(gray_frame); # {"low" : ..., "butterworth" : ...}
+
+# for offline processing (e.g. of a video file) a batch of N images can
+# instead be filtered together via process_batch() - this stacks them into
+# one contiguous (N x height x width) array, performs a single batched
+# (multi-threaded) DFT and applies each filter to all N spectra at once by
+# broadcasting (always using the half spectrum of the real input)
+
+# colour images are filtered in the same way, with each (H x W x C) image
+# contributing its C channels to the batch - so a single colour image is
+# filtered as a batch of 3 channels (via one DFT and one mask)
+
+class FrequencyFilterBank:
+
+    def __init__(self, width, height, half_spectrum=True):
+        self.width = width;
+        self.height = height;
+        self.half_spectrum = half_spectrum;
+        self.filters = OrderedDict();
+
+        # the zero padding of the input buffer is never overwritten so it
+        # only needs to be set up once
+
+        self.padded = fft_backend.aligned_zeros((height, width));
+        self.spectrum = None;
+        self.filtered = None;
+        self.filtered_name = None;
+
+        self.batch = None;
+        self.batch_channels = 1;
+        self.batch_spectrum = None;
+        self.batch_filtered = None;
+        self.batch_filtered_name = None;
+
+    # register (or replace) a filter of a given kind by name - replacing it
+    # with the same kind and parameters does nothing (as for
+    # set_parameters() below) - returns whether the filter changed
+
+    def add_filter(self, name, kind, **parameters):
+        if kind not in filter_kinds:
+            raise ValueError("unknown filter kind: " + str(kind));
+        if (self.filters.get(name) == (kind, parameters)):
+            return False;
+        self.filters[name] = (kind, dict(parameters));
+        self.filtered_name = self.batch_filtered_name = None;
+        return True;
+
+    def remove_filter(self, name):
+        del self.filters[name];
+        self.filtered_name = self.batch_filtered_name = None;
+
+    # update some or all of the parameters of a registered filter - only if
+    # any of them has changed, as this discards the filtered spectra (so
+    # that e.g. setting them from a trackbar every frame costs nothing until
+    # it moves) - returns whether they changed
+
+    def set_parameters(self, name, **parameters):
+        current = self.filters[name][1];
+        if not(any((current.get(key) != value) for key, value in parameters.items())):
+            return False;
+        current.update(parameters);
+        self.filtered_name = self.batch_filtered_name = None;
+        return True;
+
+    # get the filter mask for a registered filter
+
+    def get_filter(self, name, half_spectrum=None):
+        if half_spectrum is None:
+            half_spectrum = self.half_spectrum;
+        kind, parameters = self.filters[name];
+        return create_filter(kind, self.width, self.height, half_spectrum, **parameters);
+
+    # zero pad the image to the DFT size and perform the forward DFT
+
+    def forward(self, image):
+        height, width = image.shape[:2];
+        if (height > self.height) or (width > self.width):
+            raise ValueError("image is larger than the DFT size of the filter bank");
+
+        self.padded[:height,:width] = image;
+
+        if (self.half_spectrum):
+            self.spectrum = real_dft(self.padded, self.width, self.height);
+        else:
+            self.spectrum = cv2.dft(self.padded, flags=cv2.DFT_COMPLEX_OUTPUT);
+
+        self.filtered_name = None;
+        return self.spectrum;
+
+    # multiply the current spectrum by a filter (into the shared buffer)
+
+    def filter_spectrum(self, name):
+        if (self.filtered_name != name):
+            if (self.half_spectrum):
+                self.filtered = np.multiply(self.spectrum, self.get_filter(name), out=self.filtered);
+            else:
+                self.filtered = cv2.multiply(self.spectrum, self.get_filter(name), self.filtered);
+            self.filtered_name = name;
+        return self.filtered;
+
+    # apply a filter to the current spectrum and recover the filtered
+    # image via the inverse DFT
+
+    def apply(self, name):
+        filtered = self.filter_spectrum(name);
+        if (self.half_spectrum):
+            return inverse_real_dft(filtered, self.width, self.height);
+        return cv2.dft(filtered, flags=cv2.DFT_INVERSE | cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT);
+
+    # forward DFT of an image then apply all of the registered filters
+
+    def process(self, image):
+        self.forward(image);
+        return OrderedDict((name, self.apply(name)) for name in self.filters);
+
+    # batch versions of forward(), apply() and process() for a list (or
+    # array) of N grayscale (height x width) or colour (height x width x C)
+    # images - the results are an (N x height x width [x C]) array
+
+    def forward_batch(self, images):
+        self.batch_channels = images[0].shape[2] if (images[0].ndim == 3) else 1;
+        planes = len(images) * self.batch_channels;
+        if (self.batch is None) or (len(self.batch) != planes):
+            self.batch = fft_backend.aligned_zeros((planes, self.height, self.width));
+            self.batch_filtered = None;
+
+        for i, image in enumerate(images):
+            height, width = image.shape[:2];
+            if (height > self.height) or (width > self.width):
+                raise ValueError("image is larger than the DFT size of the filter bank");
+            if (self.batch_channels > 1):
+                self.batch[i * self.batch_channels:(i + 1) * self.batch_channels,:height,:width] = \
+                    np.moveaxis(image, 2, 0);
+            else:
+                self.batch[i,:height,:width] = image;
+
+        self.batch_spectrum = real_dft_batch(self.batch);
+        self.batch_filtered_name = None;
+        return self.batch_spectrum;
+
+    def filter_spectrum_batch(self, name):
+        if (self.batch_filtered_name != name):
+            self.batch_filtered = np.multiply(self.batch_spectrum, self.get_filter(name, half_spectrum=True),
+                                              out=self.batch_filtered);
+            self.batch_filtered_name = name;
+        return self.batch_filtered;
+
+    def apply_batch(self, name):
+        images = inverse_real_dft_batch(self.filter_spectrum_batch(name), self.width, self.height);
+        if (self.batch_channels > 1):
+            images = images.reshape(-1, self.batch_channels, self.height, self.width);
+            return np.ascontiguousarray(np.moveaxis(images, 1, 3));
+        return images;
+
+    def process_batch(self, images):
+        self.forward_batch(images);
+        return OrderedDict((name, self.apply_batch(name)) for name in self.filters);
+
+    # the magnitude of the current spectrum (or its filtered version) and
+    # the filter itself as full (width x height) images for display - both
+    # are in natural DFT order so np.fft.fftshift() them to display
+
+    # (for the i-th image of the current batch if index = i is given, with
+    # the magnitude averaged over the channels of a colour image)
+
+    def magnitude_spectrum(self, name=None, index=None):
+        if index is not None:
+            spectrum = self.batch_spectrum if name is None else self.filter_spectrum_batch(name);
+            channels = spectrum[index * self.batch_channels:(index + 1) * self.batch_channels];
+            return expand_half_spectrum(np.abs(channels).mean(axis=0), self.width);
+        spectrum = self.spectrum if name is None else self.filter_spectrum(name);
+        if (self.half_spectrum):
+            return expand_half_spectrum(np.abs(spectrum), self.width);
+        return cv2.magnitude(spectrum[:,:,0], spectrum[:,:,1]);
+
+    # apply any other filter mask (in the same form as those returned by
+    # create_filter(), e.g. from create_notch_filter() below) to the current
+    # spectrum and recover the filtered image via the inverse DFT
+
+    def apply_mask(self, mask):
+        if (self.half_spectrum):
+            self.filtered = np.multiply(self.spectrum, mask, out=self.filtered);
+            self.filtered_name = None;
+            return inverse_real_dft(self.filtered, self.width, self.height);
+        self.filtered = cv2.multiply(self.spectrum, mask, self.filtered);
+        self.filtered_name = None;
+        return cv2.dft(self.filtered, flags=cv2.DFT_INVERSE | cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT);
+
+    # render the current spectrum (or its filtered version) as a low
+    # resolution preview for display via a SpectrumView (see above) - or
+    # that of the i-th image of the current batch if index = i is given
+
+    def render_spectrum(self, view, name=None, index=None):
+        if index is not None:
+            spectrum = self.batch_spectrum if name is None else self.filter_spectrum_batch(name);
+            return view.render(spectrum[index * self.batch_channels:(index + 1) * self.batch_channels]);
+        return view.render(self.spectrum if name is None else self.filter_spectrum(name));
+
+    # the fraction of the energy of the current spectrum within a radius
+    # of F(0,0) (as for radial_energy() above, but for a single radius) - or
+    # of the i-th image of the current batch if index = i is given (over all
+    # of its channels)
+
+    # rather than a pass over the whole spectrum (as radial_energy() takes,
+    # ~ 50 ms at 4K) only the (2 radius + 1) rows and (radius + 1) columns
+    # around F(0,0) are read, and the total energy comes from the (padded)
+    # input image by Parseval's theorem, sum |F|^2 = width height sum f^2
+
+    def energy_within_radius(self, radius, index=None):
+        radius = max(0, int(radius));
+        rows = np.unique(np.arange(-radius, radius + 1) % self.height);
+        if (index is not None) or (self.half_spectrum):
+            cols = np.arange(min(radius, self.width // 2) + 1);
+        else:
+            cols = np.unique(np.arange(-radius, radius + 1) % self.width);
+
+        half_spectrum = (index is not None) or self.half_spectrum;
+        within = spectrum_radius(self.width, self.height, half_spectrum)[np.ix_(rows, cols)] <= radius;
+
+        if index is not None:
+            planes = slice(index * self.batch_channels, (index + 1) * self.batch_channels);
+            block = self.batch_spectrum[planes][:, rows][:, :, cols];
+            energy = np.square(block.real) + np.square(block.imag);
+            energy = (energy * half_spectrum_weights(self.width)[cols] * within).sum();
+            total = sum(cv2.norm(plane, cv2.NORM_L2SQR) for plane in self.batch[planes]);
+        else:
+            block = self.spectrum[np.ix_(rows, cols)];
+            if (self.half_spectrum):
+                energy = np.square(block.real) + np.square(block.imag);
+                energy = energy * half_spectrum_weights(self.width)[cols];
+            else:
+                energy = np.square(block[:,:,0]) + np.square(block[:,:,1]);
+            energy = (energy * within).sum();
+            total = cv2.norm(self.padded, cv2.NORM_L2SQR);
+
+        total *= float(self.width) * self.height;
+        return min(1.0, float(energy) / max(total, np.finfo(np.float64).tiny));
+
+    def filter_image(self, name):
+        mask = self.get_filter(name);
+        if (self.half_spectrum):
+            return expand_half_spectrum(mask, self.width);
+        return mask[:,:,0];
+
+#####################################################################
+
+# notch (reject) filter removing the frequencies around each of a set of
+# peaks (u, v) - signed frequencies, with v < 0 for the lower half of the
+# spectrum - and their conjugate mirror images (-u, -v), as a product of
+# gaussian notches of standard deviation radius (cached for each set of
+# peaks)
+
+def create_notch_filter(width, height, peaks, radius, half_spectrum=False):
+    def build():
+        if (half_spectrum):
+            x = np.arange((width // 2) + 1)[np.newaxis,:];
+        else:
+            x = np.fft.fftfreq(width, 1.0 / width)[np.newaxis,:];
+        y = np.fft.fftfreq(height, 1.0 / height)[:,np.newaxis];
+
+        response = np.ones((height, x.shape[1]), np.float32);
+        for u, v in peaks:
+            for sign in (1, -1):
+                response *= gaussian_high_pass_response(np.hypot(x - (sign * u), y - (sign * v)), radius);
+        return spectrum_filter(response, half_spectrum);
+
+    key = ("notch", width, height, half_spectrum, tuple(peaks), radius);
+    return filter_cache.get(key, build);
+
+#####################################################################
+
+# find the (count) strongest peaks of a spectrum away from F(0,0), as
+# caused by periodic noise (e.g. scan line or mains interference), and
+# filter them out with a notch filter
+
+# a peak is a local maximum of the log magnitude (found for all elements at
+# once by comparison with its grey scale dilation) that stands out from
+# the local average of the log magnitude by more than threshold, and is
+# more than min_radius from F(0,0)
+
+# as this search is relatively costly it is only repeated every interval
+# frames, or when the energy at the current peaks changes by more than
+# tolerance (as a fraction) from that when they were found - otherwise the
+# cached notch filter is reused
+
+# e.g.
+#   notch = NotchFilter(nwidth, nheight);
+#   filtered_img = bank.apply_mask(notch.update(bank.spectrum));
+
+class NotchFilter:
+
+    def __init__(self, width, height, half_spectrum=True, count=4, min_radius=10, notch_radius=3,
+                 threshold=2.0, neighbourhood=5, interval=25, tolerance=0.25):
+        self.width = width;
+        self.height = height;
+        self.half_spectrum = half_spectrum;
+        self.count = count;
+        self.min_radius = min_radius;
+        self.notch_radius = notch_radius;
+        self.threshold = threshold;
+        self.neighbourhood = neighbourhood;
+        self.interval = interval;
+        self.tolerance = tolerance;
+
+        self.peaks = [];
+        self.peak_energy = 0;
+        self.frames = 0; # since the peaks were found
+        self.mask = None;
+
+    # the magnitude of the non-redundant half of a spectrum (half or full)
+
+    def half_magnitude(self, spectrum):
+        if (self.half_spectrum):
+            return np.abs(spectrum);
+        half_width = (self.width // 2) + 1;
+        return cv2.magnitude(spectrum[:,:half_width,0], spectrum[:,:half_width,1]);
+
+    # the energy of a spectrum at the current peaks
+
+    def energy(self, spectrum):
+        if not(self.peaks):
+            return 0;
+        rows = [v % self.height for u, v in self.peaks];
+        cols = [u for u, v in self.peaks];
+        if (self.half_spectrum):
+            return float(np.sum(np.square(np.abs(spectrum[rows, cols]))));
+        return float(np.sum(np.square(spectrum[rows, cols])));
+
+    # search a spectrum for peaks, returning them as signed (u, v)
+
+    def find_peaks(self, spectrum):
+
+        # log magnitude with the rows shifted so that the neighbourhoods of
+        # the peaks are contiguous (the columns are all u >= 0)
+
+        log_magnitude = np.fft.fftshift(np.log1p(self.half_magnitude(spectrum)), axes=0);
+        log_magnitude = np.float32(log_magnitude);
+
+        size = (2 * self.neighbourhood) + 1;
+        dilated = cv2.dilate(log_magnitude, np.ones((size, size), np.uint8));
+        strength = log_magnitude - cv2.blur(log_magnitude, (4 * size, 4 * size));
+
+        distance = np.fft.fftshift(spectrum_radius(self.width, self.height, True), axes=0);
+        candidates = (log_magnitude >= dilated) & (strength > self.threshold) & (distance > self.min_radius);
+
+        # (in column u = 0, v and -v are mirror images so are the same peak)
+
+        rows, cols = np.nonzero(candidates);
+        peaks = [];
+        for i in np.argsort(strength[rows, cols])[::-1]:
+            u, v = int(cols[i]), int(rows[i]) - (self.height // 2);
+            if (u == 0):
+                v = abs(v);
+            if (u, v) not in peaks:
+                peaks.append((u, v));
+            if (len(peaks) >= self.count):
+                break;
+        return peaks;
+
+    # the notch filter for a new spectrum - searching it for peaks first if
+    # due (or forced by detect = True)
+
+    def update(self, spectrum, detect=False):
+        energy = self.energy(spectrum);
+        changed = abs(energy - self.peak_energy) > (self.tolerance * self.peak_energy);
+
+        if (detect or (self.mask is None) or (self.frames >= self.interval) or changed):
+            self.peaks = sorted(self.find_peaks(spectrum));
+            self.peak_energy = self.energy(spectrum);
+            self.frames = 0;
+            self.mask = create_notch_filter(self.width, self.height, self.peaks, self.notch_radius,
+                                            self.half_spectrum);
+
+        self.frames += 1;
+        return self.mask;
+
+#####################################################################
+
+# the spatial kernel of a filter, as a FrequencyFilterBank would apply it
+# to a whole (nwidth x nheight) image, and the half width (margin) of the
+# square around its centre holding all but a fraction tolerance of its
+# absolute weight (sum of |kernel|) - so truncating the kernel to this
+# square changes the output by at most tolerance * sum |kernel| * max
+# |image|
+
+# the filter parameters are in the frequency units of that full size DFT,
+# so the response is resampled onto a (size x size) DFT, with the same
+# spatial frequencies in cycles per pixel, and inverted to give the kernel
+# - this only matches the full size kernel if the kernel has decayed well
+# within size / 2 (beyond which it would wrap around), so size is doubled
+# until the margin is no more than size / 4
+
+# the kernel is about nwidth / D pixels across for a cut-off of D (e.g. ~
+# 800 pixels for D = 5 on a 4K image), so the margin is not a constant -
+# and it is only worth filtering in tiles if it is a small fraction of the
+# image, so a kernel that reaches out beyond a quarter of the image is
+# rejected (filter the whole image with a FrequencyFilterBank instead)
+
+def filter_kernel(kind, nwidth, nheight, size, tolerance, **parameters):
+    if kind not in filter_kinds:
+        raise ValueError("unknown filter kind: " + str(kind));
+
+    while True:
+        x = np.arange((size // 2) + 1) * (nwidth / size);
+        y = np.fft.fftfreq(size, 1.0 / size) * (nheight / size);
+        distance = np.sqrt(x[np.newaxis,:] ** 2 + y[:,np.newaxis] ** 2);
+        kernel = np.fft.irfft2(filter_kinds[kind](distance, **parameters), s=(size, size));
+
+        # the weight within each (chessboard) distance of the kernel centre
+
+        offset = np.abs(np.fft.fftfreq(size, 1.0 / size)).astype(np.int32);
+        radius = np.maximum(offset[:,np.newaxis], offset[np.newaxis,:]);
+        weight = np.cumsum(np.bincount(radius.ravel(), weights=np.abs(kernel).ravel()));
+        if (weight[-1] <= 0):
+            return kernel, 0;
+        margin = int(np.searchsorted(weight, (1 - tolerance) * weight[-1]));
+
+        if (margin * 4) > min(nwidth, nheight):
+            raise ValueError("the " + str(kind) + " filter kernel is too wide (margin " + str(margin)
+                             + ") to filter this image in tiles - use a larger tolerance or filter the"
+                             + " whole image");
+        if (margin * 4) <= size:
+            return kernel, margin;
+        size = cv2.getOptimalDFTSize(2 * size);
+
+#####################################################################
+
+# where the rows (or columns) start, start + 1, ..., start + length - 1 of
+# a zero padded image, repeating with the given period (the DFT size) as
+# the whole image DFT does, come from within the first size rows of the
+# image - as a list of (offset from start, image row, count) runs
+
+def wrapped_runs(start, length, size, period):
+    runs = [];
+    position = start;
+    while (position < start + length):
+        source = position % period;
+        count = min(start + length - position, period - source);
+        if (source < size):
+            runs.append((position - start, source, min(count, size - source)));
+        position += count;
+    return runs;
+
+# filter a (very large) grayscale image block by block using overlap-save
+# with the same frequency response that a FrequencyFilterBank would apply
+# to the whole image (padded to its optimal DFT size) in one go
+
+# the spatial kernel of the filter (see filter_kernel() above) is truncated
+# to (2 * margin + 1) pixels square - each tile of tile_size (rounded up to
+# an optimal DFT size, and enlarged to at least 4 * margin) then yields
+# (tile - 2 * margin) pixels of output after discarding the circularly
+# wrapped margin, with tiles processed by the FFT thread pool (see
+# fft_backend.get_thread_pool()), or by a pool of workers threads if given
+
+# each tile reads its input as the whole image DFT sees it - zero padded
+# to (nwidth x nheight) and then repeating - so at the image borders the
+# output wraps around in the same way, and it differs from the whole image
+# output only by the truncation of the kernel (see filter_kernel() above) -
+# e.g. for a low pass filter of an 8-bit image by at most 255 * tolerance
+# grey levels (~ 0.03 by default)
+
+# the margin is chosen from the decay of the kernel for the given filter
+# parameters (or if given, must be at least that) - the sharp cut-off of
+# the ideal filters gives slowly decaying (ringing) kernels, so these need
+# a larger tolerance (and then only match approximately)
+
+# memory is bounded by a few tiles per worker, plus the output - for
+# gigapixel images pass out as an np.memmap (and image can also be one)
+
+# e.g.
+#   filtered = filter_image_tiled(image, "butterworth_low_pass", D=100, n=2);
+
+def filter_image_tiled(image, kind, tile_size=1024, margin=None, tolerance=1e-4, workers=None, out=None,
+                       **parameters):
+    height, width = image.shape[:2];
+    nheight = cv2.getOptimalDFTSize(height);
+    nwidth = cv2.getOptimalDFTSize(width);
+
+    tile = cv2.getOptimalDFTSize(tile_size);
+    kernel, needed = filter_kernel(kind, nwidth, nheight, tile, tolerance, **parameters);
+    if margin is None:
+        margin = needed;
+        tile = cv2.getOptimalDFTSize(max(tile, 4 * margin));
+    elif (margin < needed):
+        raise ValueError("margin must be at least " + str(needed) + " for this filter (and tolerance)");
+    if (2 * margin) >= tile:
+        raise ValueError("margin must be less than half of the tile size");
+    block = tile - (2 * margin);
+
+    # the truncated kernel, centred on (0, 0) of the tile
+
+    size = kernel.shape[0];
+    tile_kernel = np.zeros((tile, tile), np.float32);
+    reach = min(margin, (size - 1) // 2);
+    offsets = np.arange(-reach, reach + 1);
+    tile_kernel[np.ix_(offsets % tile, offsets % tile)] = kernel[np.ix_(offsets % size, offsets % size)];
+    backend = fft_backend.get_backend();
+    kernel_spectrum = backend.rfft2(tile_kernel);
+
+    if out is None:
+        out = np.empty((height, width), np.float32);
+
+    # filter the tile whose (valid) output starts at (x0, y0) - reading the
+    # input with a border of margin pixels, wrapped around as above
+
+    def filter_tile(origin):
+        x0, y0 = origin;
+        padded = np.zeros((tile, tile), np.float32);
+        for row, top, rows in wrapped_runs(y0 - margin, tile, height, nheight):
+            for col, left, cols in wrapped_runs(x0 - margin, tile, width, nwidth):
+                padded[row:row + rows, col:col + cols] = image[top:top + rows, left:left + cols];
+
+        filtered = backend.irfft2(backend.rfft2(padded) * kernel_spectrum, tile, tile);
+
+        rows = min(block, height - y0);
+        cols = min(block, width - x0);
+        out[y0:y0 + rows, x0:x0 + cols] = filtered[margin:margin + rows, margin:margin + cols];
+
+    origins = [(x0, y0) for y0 in range(0, height, block) for x0 in range(0, width, block)];
+    if workers is None:
+        list(fft_backend.get_thread_pool().map(filter_tile, origins));
+    else:
+        with ThreadPoolExecutor(workers) as pool:
+            list(pool.map(filter_tile, origins));
+
+    return out;
+
+#####################################################################
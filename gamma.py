@@ -13,9 +13,8 @@
 #####################################################################
 
 import cv2
-import math
 import sys
-import numpy as np
+from point_transforms import PointTransformChain
 
 #####################################################################
 
@@ -32,23 +31,6 @@ def nothing(x):
 
 #####################################################################
 
-# power law transform
-# I - colour image I
-# gamma - "gradient" co-efficient of gamma function
-
-def powerlaw_transform(I, gamma):
-
-    # compute power-law transform
-    # remembering not defined for pixel = 0 (!)
-
-    # handle any overflow in a quick and dirty way using 0-255 clipping
-
-    I = np.clip(np.power(I, gamma), 0, 255).astype('uint8')
-
-    return I;
-
-#####################################################################
-
 # define video capture object
 
 cap = cv2.VideoCapture();
@@ -75,6 +57,14 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
     cv2.createTrackbar("gamma, (* 0.01)", windowName2, gamma, 500, nothing);
 
+    # the power law transform as a (one step) chain of point transforms -
+    # computed once for each of the 256 possible pixel values into a look up
+    # table, only rebuilt when gamma changes, that is applied to all three
+    # colour channels via cv2.LUT() (see point_transforms.py)
+
+    chain = PointTransformChain();
+    chain.add("gamma", "power_law", gamma=1.0);
+
     while (keep_processing):
 
         # if video file successfully open then read frame from video
@@ -86,13 +76,13 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         gamma = cv2.getTrackbarPos("gamma, (* 0.01)", windowName2) * 0.01;
 
-        # make a copy
-
-        gamma_img = frame.copy();
+        # use power-law function to perform gamma correction (into a new image)
 
-        # use power-law function to perform gamma correction
+        # (remembering not defined for pixel = 0 (!) and handling any
+        # overflow in a quick and dirty way using 0-255 clipping)
 
-        gamma_img = powerlaw_transform(gamma_img, gamma);
+        chain.set_parameters("gamma", gamma=gamma);
+        gamma_img = chain.apply(frame);
 
         # display image
 
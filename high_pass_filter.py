@@ -16,22 +16,20 @@
 
 import cv2
 import sys
-import numpy as np
 import math
+from fft_backend import autotune, autotune_summary
+from fourier_filters import FrequencyFilterBank, SpectrumView, normalize_image
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
 
-#####################################################################
-
-# create a simple high pass filter
-
-def create_high_pass_filter(width, height, radius):
-    hp_filter = np.ones((height, width, 2), np.float32);
-    cv2.circle(hp_filter, (width / 2, height / 2), radius, (0,0,0), thickness=-1)
-    return hp_filter
+use_real_dft = True; # filter only the half spectrum of the (real) input
+batch_size = 1; # frames filtered together when reading from a video file (1 = off, e.g. 8)
+use_colour = False; # filter all three colour channels (toggle with "c")
+show_spectrum = True; # display the magnitude spectrum (toggle with "s")
+spectrum_size = 256; # maximum size of the (low resolution) spectrum display
 
 #####################################################################
 
@@ -85,76 +83,142 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     nheight = cv2.getOptimalDFTSize(hieght);
     nwidth = cv2.getOptimalDFTSize(width);
 
-    while (keep_processing):
+    # Performance of DFT calculation, via the FFT, is better for array sizes of power of two.
+    # Arrays whose size is a product of 2's, 3's, and 5's are also processed quite efficiently.
+    # Hence the filter bank zero pads each image to this optimal size before finding the DFT.
+
+    filter_bank = FrequencyFilterBank(nwidth, nheight, half_spectrum=use_real_dft);
+    filter_bank.add_filter("high pass", "high_pass", radius=radius);
+
+    # the low resolution view of the spectrum used for display
+
+    spectrum_view = SpectrumView(nwidth, nheight, max_size=spectrum_size);
 
-        # if video file successfully open then read frame from video
+    # when processing a video file (rather than a live camera) we can read ahead, so frames are
+    # instead filtered in batches of batch_size - all using a single (multi-threaded) batched DFT
+    # (off by default, as at 1080p on a single core this is ~ 1.3x slower per frame than filtering
+    # each frame as it is read - so only worth trying with several FFT threads)
 
-        if (cap.isOpened):
-            ret, frame = cap.read();
+    use_batch = (len(sys.argv) == 2) and (batch_size > 1);
+    batch_frames = [];
+    batch_index = 0;
+    spectrum_index = None;
+
+    # pick the fastest of the available FFT implementations on this machine for this DFT size
+    # (and batch size) - this is only benchmarked the first time, after which the choice is
+    # read back from a cache (see fft_backend.autotune()) - and report the choice
+
+    if (use_real_dft or use_batch):
+        name, timings, cached = autotune(nwidth, nheight, batch=(batch_size if use_batch else 1));
+        print(autotune_summary(name, timings, cached));
+
+    while (keep_processing):
 
         # start a timer (to see how long processing and display takes)
 
         start_t = cv2.getTickCount();
 
-         # convert to grayscale
+        # get the current filter settings from the track bars
 
-        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+        radius = cv2.getTrackbarPos("radius",windowName2);
 
-        # Performance of DFT calculation, via the FFT, is better for array sizes of power of two.
-        # Arrays whose size is a product of 2's, 3's, and 5's are also processed quite efficiently.
-        # Hence ee modify the size of the array tothe optimal size (by padding zeros) before finding DFT.
+        # (the filter is only changed, and the spectrum refiltered, if a setting has changed -
+        # and then the rest of the current batch is refiltered too, so the display does not
+        # lag behind the track bars until the next batch is read)
 
-        pad_right = nwidth - width;
-        pad_bottom = nheight - hieght;
-        nframe = cv2.copyMakeBorder(gray_frame,0,pad_bottom,0,pad_right,cv2.BORDER_CONSTANT, value = 0);
+        if (filter_bank.set_parameters("high pass", radius=radius) and use_batch and (batch_index < len(batch_frames))):
+            batch_filtered_imgs = filter_bank.apply_batch("high pass");
 
-        # perform the DFT and get complex output
+        if (use_batch):
 
-        dft = cv2.dft(np.float32(nframe),flags = cv2.DFT_COMPLEX_OUTPUT);
+            # once all of the current batch has been displayed read the next batch of frames
+            # from the video file (converted to grayscale unless filtering in colour) and
+            # high pass filter them all together
 
-        # shift it so that we the zero-frequency, F(0,0), DC component to the center of the spectrum.
+            if (batch_index >= len(batch_frames)):
+                batch_frames = [];
+                while (len(batch_frames) < batch_size):
+                    ret, frame = cap.read();
+                    if not(ret):
+                        break;
+                    if (use_colour):
+                        input_frame = frame;
+                    else:
+                        input_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
-        dft_shifted = np.fft.fftshift(dft);
+                    batch_frames.append(input_frame);
 
-        # perform high pass filtering
+                # stop at the end of the video file
 
-        radius = cv2.getTrackbarPos("radius",windowName2);
-        hp_filter = create_high_pass_filter(nwidth, nheight, radius);
+                if (len(batch_frames) == 0):
+                    break;
 
-        dft_filtered = cv2.mulSpectrums(dft_shifted, hp_filter, flags=0);
+                batch_filtered_imgs = filter_bank.process_batch(batch_frames)["high pass"];
+                batch_index = 0;
 
-        # shift it back to original quaderant ordering
+            input_frame = batch_frames[batch_index];
+            filtered_img = batch_filtered_imgs[batch_index];
+            spectrum_index = batch_index;
+            batch_index += 1;
 
-        dft = np.fft.fftshift(dft_filtered);
+        else:
 
-        # recover the original image via the inverse DFT
+            # if video file successfully open then read frame from video
 
-        filtered_img = cv2.dft(dft, flags = cv2.DFT_INVERSE);
+            if (cap.isOpened):
+                ret, frame = cap.read();
 
-        # normalized the filtered image into 0 -> 255 (8-bit grayscale) so we can see the output
+            if (use_colour):
+
+                # filter the three colour channels together as a batch of 3 images (i.e. via
+                # a single batched DFT with the filter applied to all three at once)
+
+                input_frame = frame;
 
-        minVal, maxVal, minLoc, maxLoc = cv2.minMaxLoc(filtered_img[:,:,0]);
-        filtered_img_normalized = filtered_img[:,:,0] * (1.0/(maxVal-minVal)) + ((-minVal)/(maxVal-minVal));
-        filtered_img_normalized = np.uint8(filtered_img_normalized * 255);
+                filtered_img = filter_bank.process_batch([input_frame])["high pass"][0];
+                spectrum_index = 0;
 
-        # calculate the magnitude spectrum and log transform + scale it for visualization
+            else:
 
-        magnitude_spectrum = np.log(cv2.magnitude(dft_filtered[:,:,0],dft_filtered[:,:,1]));
+                # convert to grayscale
 
-        # create a 8-bit image to put the magnitude spectrum into
+                input_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
-        magnitude_spectrum_normalized = np.zeros((nheight,nwidth,1), np.uint8);
+                # perform the DFT (of the zero padded image) and then high pass filtering, recovering
+                # the filtered image via the inverse DFT
 
-        # normalized the magnitude spectrum into 0 -> 255 (8-bit grayscale) so we can see the output
+                filter_bank.forward(input_frame);
+                filtered_img = filter_bank.apply("high pass");
+                spectrum_index = None;
 
-        cv2.normalize(np.uint8(magnitude_spectrum), magnitude_spectrum_normalized, alpha=0, beta=255, norm_type=cv2.NORM_MINMAX);
+        # normalized the filtered image into 0 -> 255 (8-bit grayscale) so we can see the output
+
+        filtered_img_normalized = normalize_image(filtered_img);
 
         # display images
 
-        cv2.imshow(windowName,gray_frame);
-        cv2.imshow(windowName2,magnitude_spectrum_normalized);
+        cv2.imshow(windowName,input_frame);
         cv2.imshow(windowName3,filtered_img_normalized);
 
+        # the magnitude spectrum is only needed for display so only calculate it when it is
+        # shown and its window is visible - and then only at a low resolution, sampling it
+        # directly in the shifted order so that the zero-frequency, F(0,0), DC component is at
+        # the center of it (see fourier_filters.SpectrumView)
+
+        if (show_spectrum and (cv2.getWindowProperty(windowName2, cv2.WND_PROP_VISIBLE) >= 1)):
+
+            # log transform + scale the magnitude spectrum for visualization
+
+            magnitude_spectrum_normalized = filter_bank.render_spectrum(spectrum_view, "high pass", spectrum_index);
+
+            # and label it with the fraction of the energy of the spectrum that the filter retains
+
+            retained = 1 - filter_bank.energy_within_radius(radius, spectrum_index);
+            cv2.putText(magnitude_spectrum_normalized, "energy retained: %.1f%%" % (retained * 100),
+                        (5, 15), cv2.FONT_HERSHEY_SIMPLEX, 0.4, 255, 1);
+
+            cv2.imshow(windowName2,magnitude_spectrum_normalized);
+
         # stop timer and convert to ms. (to see how long processing and display takes)
 
         stop_t = ((cv2.getTickCount() - start_t)/cv2.getTickFrequency()) * 1000;
@@ -173,10 +237,15 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         # It can also be set to detect specific key strokes by recording which key is pressed
 
-        # e.g. if user presses "x" then exit
+        # e.g. if user presses "x" then exit, "c" to toggle filtering in colour or "s" to
+        # toggle the display of the spectrum
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('c')):
+            use_colour = not(use_colour);
+        elif (key == ord('s')):
+            show_spectrum = not(show_spectrum);
 
     # close all windows
 
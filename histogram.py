@@ -13,39 +13,16 @@
 #####################################################################
 
 import cv2
-import numpy as np
 import sys
+from histogram_plot import HistogramPlot
+from histogram_tools import sampled_histogram
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 0; # 0 if you have one camera, 1 or > 1 otherwise
 
-#####################################################################
-
-# basic grayscale histogram drawing in raw OpenCV using either a curve or lines
-
-# adapted from:
-# https://raw.githubusercontent.com/Itseez/opencv/master/samples/python2/hist.py
-
-def hist_curve(hist):
-    h = np.ones((300,256,3))  * 255 # white background
-    bins = np.arange(256).reshape(256,1)
-    cv2.normalize(hist,hist,0,255,cv2.NORM_MINMAX)
-    hist=np.int32(np.around(hist))
-    pts = np.int32(np.column_stack((bins,hist)))
-    cv2.polylines(h,[pts],False,(0,0,0)) # black line
-    y=np.flipud(h)
-    return y
-
-def hist_lines(hist):
-    h = np.ones((300,256,3)) * 255 # white background
-    cv2.normalize(hist,hist,0,255,cv2.NORM_MINMAX)
-    hist=np.int32(np.around(hist))
-    for x,y in enumerate(hist):
-        cv2.line(h,(x,0),(x,y),(0,0,0)) # black bars
-    y = np.flipud(h)
-    return y
+sample_budget = 250000; # max. pixels sampled for each histogram (0 to use every pixel)
 
 #####################################################################
 
@@ -72,6 +49,11 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     cv2.namedWindow(windowName2, cv2.WINDOW_NORMAL);
     cv2.namedWindow(windowName3, cv2.WINDOW_NORMAL);
 
+    # the histogram plots (each drawn into its own image, reused every frame)
+
+    bar_plot = HistogramPlot();
+    line_plot = HistogramPlot();
+
     while (keep_processing):
 
         # if video file successfully open then read frame from video
@@ -86,13 +68,16 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
         # calculate the histogram over the whole image, for 1 channel
         # with one bin (histogram entry) for each value in the range 0 -> 255
 
-        hist = cv2.calcHist([gray_img],[0],None,[256],[0,256]);
+        # (for large images, estimated from a sample of sample_budget pixels -
+        # see histogram_tools.py)
+
+        hist, error = sampled_histogram(gray_img, sample_budget);
 
         # draw the histogram distribution as an image
         # in two different visual forms (same info.)
 
-        hist_img = hist_lines(hist);
-        hist_img2 = hist_curve(hist);
+        hist_img = bar_plot.bars(hist);
+        hist_img2 = line_plot.curve(hist);
 
         # display images
 
@@ -13,29 +13,19 @@
 #####################################################################
 
 import cv2
-import numpy as np
 import sys
+from histogram_plot import HistogramPlot
+from histogram_tools import StreamingHistogram, equalization_lut, sampled_histogram
+from point_transforms import split_luminance, merge_luminance
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
 
-#####################################################################
-
-# basic grayscale histogram drawing in raw OpenCV using lines
-
-# adapted from:
-# https://raw.githubusercontent.com/Itseez/opencv/master/samples/python2/hist.py
-
-def hist_lines(hist):
-    h = np.ones((300,256,3)) * 255 # white background
-    cv2.normalize(hist,hist,0,255,cv2.NORM_MINMAX)
-    hist=np.int32(np.around(hist))
-    for x,y in enumerate(hist):
-        cv2.line(h,(x,0),(x,y),(0,0,0)) # black bars
-    y = np.flipud(h)
-    return y
+use_colour = False; # process the luminance of the colour image (toggle with "c")
+use_streaming = False; # use a running histogram over the video (toggle with "s")
+sample_budget = 250000; # max. pixels sampled for each histogram (0 to use every pixel)
 
 #####################################################################
 
@@ -63,6 +53,17 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
     cv2.namedWindow(windowName3, cv2.WINDOW_NORMAL);
     cv2.namedWindow(windowName4, cv2.WINDOW_NORMAL);
 
+    # the histogram plots (each drawn into its own image, reused every frame)
+
+    input_plot = HistogramPlot();
+    output_plot = HistogramPlot();
+
+    # a running histogram of the video (from every 4th pixel of every 4th
+    # row of each frame), with its equalization look up table only
+    # recomputed when the distribution drifts
+
+    streaming = StreamingHistogram(alpha=0.1, stride=4, threshold=0.02);
+
     while (keep_processing):
 
         # if video file successfully open then read frame from video
@@ -70,20 +71,43 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
         if (cap.isOpened):
             ret, frame = cap.read();
 
-        # convert to grayscale
+        # convert to grayscale - or for colour, convert to YCrCb and process
+        # its luminance channel (Y) in place of the grayscale image
+
+        if (use_colour):
+            converted, gray_img = split_luminance(frame);
+        else:
+            gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+
+        # perform histogram equalization - of each frame from its own
+        # histogram, or from the running histogram (which avoids the output
+        # flickering as the content of the frame changes slightly)
+
+        # (the histogram of each frame is also that displayed - for large
+        # images it is estimated from a sample of sample_budget pixels, see
+        # histogram_tools.py, otherwise this is the same as cv2.equalizeHist())
+
+        hist, error = sampled_histogram(gray_img, sample_budget);
 
-        gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+        if (use_streaming):
+            streaming.update(gray_img);
+            output = cv2.LUT(gray_img, streaming.equalization_lut());
+        else:
+            output = cv2.LUT(gray_img, equalization_lut(hist.ravel() / gray_img.size));
 
-        # perform histogram equalization
+        # for colour, put the processed luminance back and convert to BGR
 
-        output = cv2.equalizeHist(gray_img);
+        if (use_colour):
+            output_img = merge_luminance(converted, output);
+        else:
+            output_img = output;
 
         # display image
 
-        cv2.imshow(windowName1,gray_img);
-        cv2.imshow(windowName2,hist_lines(cv2.calcHist([gray_img],[0],None,[256],[0,256])));
-        cv2.imshow(windowName3,output);
-        cv2.imshow(windowName4,hist_lines(cv2.calcHist([output],[0],None,[256],[0,256])));
+        cv2.imshow(windowName1,frame if use_colour else gray_img);
+        cv2.imshow(windowName2,input_plot.bars(hist));
+        cv2.imshow(windowName3,output_img);
+        cv2.imshow(windowName4,output_plot.bars(sampled_histogram(output, sample_budget)[0]));
 
         # start the event loop - essential
 
@@ -101,6 +125,10 @@ if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('c')):
+            use_colour = not(use_colour);
+        elif (key == ord('s')):
+            use_streaming = not(use_streaming);
 
     # close all windows
 
@@ -0,0 +1,84 @@
+#####################################################################
+
+# Module : drawing of (256 bin) histograms as images, as a bar graph or a
+# line graph, into a canvas reused from frame to frame
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import numpy as np
+
+#####################################################################
+
+# a histogram plot - black on white, one column per bin, with the
+# histogram scaled so that its minimum to maximum counts span 0 -> 255
+# pixels from the bottom of the (height x bins) canvas (as in the
+# original examples, adapted from:
+# https://raw.githubusercontent.com/Itseez/opencv/master/samples/python2/hist.py)
+
+# the bar graph is drawn as a single comparison of the height of each row
+# above the bottom of the canvas against the (scaled) count of each bin -
+# rather than a line per bin - and if the scaled histogram is unchanged
+# since the last plot the canvas is returned as it is
+
+# each plot has its own canvas, which is overwritten by the next plot -
+# so use one HistogramPlot per histogram window, e.g.
+#   input_plot = HistogramPlot();
+#   cv2.imshow(window_name, input_plot.bars(cv2.calcHist(...)));
+
+class HistogramPlot:
+
+    def __init__(self, height=300, bins=256, max_height=255):
+        self.max_height = max_height;
+        self.canvas = np.full((height, bins), 255, np.uint8);
+        self.background = np.empty((height, bins), bool);
+        self.levels = np.arange(height - 1, -1, -1, dtype=np.int32)[:,np.newaxis];
+        self.style = None; # the last plot drawn ("bars" or "curve") ...
+        self.heights = None; # ... and its scaled histogram
+
+    # scale the counts of a histogram (any shape, e.g. 256 x 1 as returned
+    # by cv2.calcHist()) to 0 -> max_height, as integers
+
+    def scale(self, hist):
+        hist = np.float32(hist).ravel();
+        low, high = hist.min(), hist.max();
+        if (high <= low):
+            return np.zeros(hist.size, np.int32);
+        return np.int32(np.rint((hist - low) * (self.max_height / (high - low))));
+
+    # check if the plot needs drawing, recording what it will be
+
+    def changed(self, style, heights):
+        if ((style == self.style) and np.array_equal(heights, self.heights)):
+            return False;
+        self.style = style;
+        self.heights = heights;
+        return True;
+
+    # draw the histogram as a bar graph - a bar from the bottom of the
+    # canvas up to the count of each bin
+
+    def bars(self, hist):
+        heights = self.scale(hist);
+        if self.changed("bars", heights):
+            np.greater(self.levels, heights, out=self.background);
+            np.multiply(self.background, np.uint8(255), out=self.canvas);
+        return self.canvas;
+
+    # draw the histogram as a line graph through the count of each bin
+
+    def curve(self, hist):
+        heights = self.scale(hist);
+        if self.changed("curve", heights):
+            self.canvas.fill(255);
+            points = np.column_stack((np.arange(heights.size), (self.canvas.shape[0] - 1) - heights));
+            cv2.polylines(self.canvas, [np.int32(points)], False, 0);
+        return self.canvas;
+
+#####################################################################
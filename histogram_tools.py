@@ -0,0 +1,282 @@
+#####################################################################
+
+# Module : histograms of 8-bit video frames for the histogram based
+# contrast examples - histograms estimated from a sample of each frame, a
+# temporally smoothed (streaming) histogram, and the equalization /
+# contrast stretch look up tables (LUTs) computed from them - and a pool
+# of CLAHE (contrast limited adaptive histogram equalization) objects
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import numpy as np
+from collections import OrderedDict
+from point_transforms import compile_lut
+
+# the random number generator used for sampling
+
+random = np.random.default_rng();
+
+#####################################################################
+
+# the normalized (sums to 1) 256 bin histogram of every stride-th pixel of
+# every stride-th row of an 8-bit (grayscale) image
+
+def subsampled_histogram(image, stride=1):
+    counts = np.bincount(image[::stride,::stride].ravel(), minlength=256);
+    return counts / max(counts.sum(), 1);
+
+# the histogram equalization LUT for a normalized histogram - as
+# cv2.equalizeHist() computes from the histogram of a single image
+
+def equalization_lut(histogram):
+    cdf = np.cumsum(histogram);
+    first = histogram[np.flatnonzero(histogram)[0]] if histogram.any() else 0;
+    if (first >= 1):
+        return np.arange(256, dtype=np.uint8);
+    values = np.rint((cdf - first) * (255.0 / (1 - first)));
+    return np.uint8(np.clip(values, 0, 255));
+
+# the range of intensities (low, high) between the low_percent and
+# high_percent percentiles of a histogram (counts or normalized, any
+# shape) - read from its cumulative histogram, so O(256) rather than a pass
+# over the image - with 0 and 100 giving its minimum and maximum
+
+def percentile_range(hist, low_percent=1.0, high_percent=99.0):
+    cdf = np.cumsum(np.float64(hist).ravel());
+    if (cdf[-1] <= 0):
+        return 0, 255;
+    cdf /= cdf[-1];
+    low = int(np.searchsorted(cdf, low_percent / 100.0, side='right'));
+    high = int(np.searchsorted(cdf, (high_percent / 100.0) - 1e-9, side='left'));
+    low, high = min(low, 255), min(high, 255);
+    return low, max(high, low);
+
+# the contrast stretch LUT mapping that range to 0 -> 255 (compiled and
+# cached as for all of the point transforms - see point_transforms.py)
+
+def percentile_stretch_lut(hist, low_percent=1.0, high_percent=99.0):
+    low, high = percentile_range(hist, low_percent, high_percent);
+    return compile_lut("contrast_stretch", low=low, high=high);
+
+#####################################################################
+
+# the 256 bin histogram of an 8-bit (grayscale) image estimated from a
+# random sample of at most budget of its pixels (chosen uniformly, with
+# replacement) - or from every pixel (i.e. exactly, via cv2.calcHist())
+# if that is cheaper
+
+# the counts are scaled up to those of the whole image, returned (as for
+# cv2.calcHist()) as float32 (256 x 1), along with the expected (standard)
+# error of each count - for a fraction p of the pixels in a bin, sampled
+# from m pixels of N, this is N sqrt(p (1 - p) / m), so is never more
+# than N / (2 sqrt(m)) (e.g. 0.1% of the pixels for m = 250,000) however
+# large the image - with p taken as at least 1 / m, as a bin that none of
+# the sample falls in may still hold ~ N / m pixels
+
+# this error only holds for a random sample - method="strided" instead
+# takes a regular grid (every stride-th pixel of every stride-th row),
+# which is cheaper but aliases with periodic content (e.g. stripes every
+# few rows) so its counts can be far outside the reported error
+
+# drawing a random pixel costs ~ 15-20 times as much as counting one in
+# cv2.calcHist() of the whole image (~ 12 ns against 0.7 ns), so the image
+# is only sampled if it has more than exact_ratio times budget pixels
+# (~ 4 megapixels for the default budget, i.e. 4K video but not 1080p)
+
+exact_ratio = 16;
+
+# e.g.
+#   hist, error = sampled_histogram(gray_frame, budget=250000);
+
+def sampled_histogram(image, budget=250000, method="random"):
+    total = image.size;
+    if (budget <= 0) or (total <= exact_ratio * budget):
+        return cv2.calcHist([image],[0],None,[256],[0,256]).reshape(256, 1), np.zeros((256, 1), np.float32);
+
+    if (method == "strided"):
+        stride = int(np.ceil(np.sqrt(total / budget)));
+        sample = image[::stride,::stride].ravel();
+    else:
+        index_type = np.int32 if (total < 2 ** 31) else np.int64;
+        sample = np.take(image.ravel(), random.integers(0, total, budget, dtype=index_type));
+
+    counts = np.bincount(sample, minlength=256).reshape(256, 1);
+    p = counts / sample.size;
+    q = np.maximum(p, 1.0 / sample.size);
+    error = total * np.sqrt(q * (1 - q) / sample.size);
+    return np.float32(p * total), np.float32(error);
+
+#####################################################################
+
+# per channel percentile stretching of a colour (e.g. BGR) image - the
+# range (low, high) of each channel, between its low_percent and
+# high_percent percentiles, is read from its own (sampled) histogram, and
+# returned along with those histograms - with low_percent = 0 and
+# high_percent = 100 giving the exact minimum and maximum of each channel
+# (as for cv2.normalize() with norm_type=cv2.NORM_MINMAX, which a sample
+# may miss)
+
+def channel_percentile_ranges(image, low_percent=1.0, high_percent=99.0, budget=250000):
+    ranges, hists = [], [];
+    for channel in range(image.shape[2]):
+        plane = cv2.extractChannel(image, channel);
+        hist, error = sampled_histogram(plane, budget);
+        if (low_percent <= 0) and (high_percent >= 100):
+            low, high = cv2.minMaxLoc(plane)[:2];
+            ranges.append((int(low), int(high)));
+        else:
+            ranges.append(percentile_range(hist, low_percent, high_percent));
+        hists.append(hist);
+    return ranges, hists;
+
+# the contrast stretch LUTs for those ranges, merged into a single (256 x 1
+# x channels) table so that every channel is stretched by one cv2.LUT()
+
+# e.g.
+#   output = cv2.LUT(frame, percentile_stretch_channels_lut(frame, 1, 99));
+
+def percentile_stretch_channels_lut(image, low_percent=1.0, high_percent=99.0, budget=250000):
+    ranges, hists = channel_percentile_ranges(image, low_percent, high_percent, budget);
+    luts = [compile_lut("contrast_stretch", low=low, high=high) for low, high in ranges];
+    return np.dstack(luts).reshape(256, 1, -1);
+
+#####################################################################
+
+# a running histogram of a video - an exponentially weighted moving
+# average, h = h + alpha (h_frame - h), of the histograms of a subsample
+# (every stride-th pixel of every stride-th row) of each frame
+
+# the LUTs computed from it (for equalization or contrast stretching) are
+# only recomputed when the distribution has drifted - when the total
+# variation distance, 1/2 sum |h - h_ref|, between the running histogram
+# and that the LUTs were last computed from (h_ref) exceeds threshold
+
+# compared to equalizing / stretching every frame from its own full
+# histogram this both reduces the per frame cost (a histogram of 1 /
+# stride^2 of the pixels, plus a cv2.LUT()) and stops the output
+# flickering as the content of each frame changes slightly
+
+# e.g.
+#   streaming = StreamingHistogram(alpha=0.1, stride=4);
+#   for each frame : streaming.update(gray_frame);
+#                    output = cv2.LUT(gray_frame, streaming.equalization_lut());
+
+class StreamingHistogram:
+
+    def __init__(self, alpha=0.1, stride=4, threshold=0.02):
+        self.alpha = alpha;
+        self.stride = stride;
+        self.threshold = threshold;
+
+        self.histogram = None; # the running histogram
+        self.reference = None; # the histogram the LUTs are computed from
+        self.luts = {};
+        self.updates = 0; # of the reference histogram (and so the LUTs)
+
+    # add the next (grayscale) frame
+
+    def update(self, image):
+        frame_histogram = subsampled_histogram(image, self.stride);
+        if self.histogram is None:
+            self.histogram = frame_histogram;
+        else:
+            self.histogram += self.alpha * (frame_histogram - self.histogram);
+
+        if ((self.reference is None) or (self.drift() > self.threshold)):
+            self.reference = self.histogram.copy();
+            self.luts.clear();
+            self.updates += 1;
+
+        return self.histogram;
+
+    # the total variation distance between the running and reference
+    # histograms (0 -> 1)
+
+    def drift(self):
+        return 0.5 * np.abs(self.histogram - self.reference).sum();
+
+    # the range of intensities (low, high) in the reference histogram,
+    # between the percent and 100 - percent percentiles (by default
+    # ignoring only the faint tails left in the running histogram by
+    # intensities that are no longer present)
+
+    def stretch_range(self, percent=0.01):
+        return percentile_range(self.reference, percent, 100 - percent);
+
+    # the LUTs (cached until the reference histogram is next updated)
+
+    def equalization_lut(self):
+        if "equalize" not in self.luts:
+            self.luts["equalize"] = equalization_lut(self.reference);
+        return self.luts["equalize"];
+
+    def stretch_lut(self, percent=0.01):
+        if ("stretch", percent) not in self.luts:
+            self.luts[("stretch", percent)] = percentile_stretch_lut(self.reference, percent, 100 - percent);
+        return self.luts[("stretch", percent)];
+
+#####################################################################
+
+# a pool of CLAHE objects keyed by their parameters, so that one is only
+# created when the parameters change (and reused if they change back) -
+# the least recently used is discarded once there are more than max_size
+
+# clip_limit must be >= 0 (0 for no limit) and tile_size (the number of
+# tiles across / down the image) >= 1 - as cv2.createCLAHE() does not
+# check these, and a tile size of 0 only fails when the object is used
+
+# e.g.
+#   clahe_pool = CLAHEPool();
+#   output = clahe_pool.get(clip_limit, tile_size).apply(gray_frame);
+
+class CLAHEPool:
+
+    def __init__(self, max_size=8):
+        self.max_size = max_size;
+        self.pool = OrderedDict();
+
+    def get(self, clip_limit, tile_size):
+        if not(clip_limit >= 0):
+            raise ValueError("CLAHE clip limit must be >= 0: " + str(clip_limit));
+        if (int(tile_size) < 1):
+            raise ValueError("CLAHE tile size must be >= 1: " + str(tile_size));
+
+        key = (float(clip_limit), int(tile_size));
+        clahe = self.pool.get(key);
+        if clahe is not None:
+            self.pool.move_to_end(key);
+            return clahe;
+
+        clahe = cv2.createCLAHE(clipLimit=float(clip_limit), tileGridSize=(int(tile_size), int(tile_size)));
+        self.pool[key] = clahe;
+
+        while (len(self.pool) > self.max_size):
+            self.pool.popitem(last=False);
+
+        return clahe;
+
+#####################################################################
+
+# check the per channel stretch - for a colour image whose channels each
+# span a different range, the low and high percentiles of each channel
+# should map to 0 and 255 (python histogram_tools.py)
+
+if __name__ == "__main__":
+    ramp = np.arange(100, dtype=np.uint8);
+    image = cv2.merge([np.tile(ramp + offset, (64, 1)) for offset in (0, 50, 150)]);
+    output = cv2.LUT(image, percentile_stretch_channels_lut(image, 5, 95));
+    for channel, offset in enumerate((0, 50, 150)):
+        low, high = np.percentile(ramp + offset, [5, 95]);
+        column_low = int(np.ceil(low)) - offset;
+        column_high = int(np.floor(high)) - offset;
+        if (output[0, column_low, channel] != 0) or (output[0, column_high, channel] != 255):
+            raise ValueError("channel " + str(channel) + " percentiles map to "
+                             + str(output[0, [column_low, column_high], channel]));
+    print("each channel's percentiles map to 0 and 255");
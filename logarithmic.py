@@ -13,13 +13,15 @@
 #####################################################################
 
 import cv2
-import math
+from point_transforms import PointTransformChain, split_luminance, merge_luminance
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
 
+use_colour = False; # process the luminance of the colour image (toggle with "c")
+
 #####################################################################
 
 # this function is called as a call-back everytime the trackbar is moved
@@ -30,23 +32,6 @@ def nothing(x):
 
 #####################################################################
 
-# logarithmic transform
-# I - greyscale image I
-# C - scaling constant
-# sigma - "gradient" co-efficient of logarithmic function
-
-def logarithmic_transform(I, C, sigma):
-    for i in range(0, I.shape[1]): # image width
-        for j in range(0, I.shape[0]): # image height
-
-            # compute logarithmic transform
-
-            I[j,i] = int(C * math.log(1 + ((math.exp(sigma) - 1) * I[j,i])));
-
-    return I;
-
-#####################################################################
-
 # define video capture object
 
 cap = cv2.VideoCapture();
@@ -74,6 +59,16 @@ if cap.open(camera_to_use):
     sigma = 1;
     cv2.createTrackbar("sigma (*0.01)", windowName2, sigma, 10, nothing);
 
+    # the logarithmic transform as a (one step) chain of point transforms -
+    # as the output for each pixel depends only on its (8-bit) value, the
+    # transform, int(C * log(1 + ((exp(sigma) - 1) * I))), is computed once
+    # for each of the 256 possible values into a look up table (only rebuilt
+    # when C or sigma change) and applied to the whole image via cv2.LUT()
+    # (see point_transforms.py)
+
+    chain = PointTransformChain();
+    chain.add("log", "logarithmic", C=10, sigma=0.01);
+
     while (keep_processing):
 
         # if video file successfully open then read frame from video
@@ -81,24 +76,35 @@ if cap.open(camera_to_use):
         if (cap.isOpened):
             ret, frame = cap.read();
 
-        # convert to grayscale
+        # convert to grayscale - or for colour, convert to YCrCb and process
+        # its luminance channel (Y) in place of the grayscale image
 
-        gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+        if (use_colour):
+            converted, gray_img = split_luminance(frame);
+        else:
+            gray_img = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
 
         # get parameters from track bars
 
         constant = cv2.getTrackbarPos("constant, C", windowName2);
         sigma = cv2.getTrackbarPos("sigma (*0.01)", windowName2) * 0.01;
 
-        # make a copy and log tranform it
+        # log tranform it (into a new image)
+
+        chain.set_parameters("log", C=constant, sigma=sigma);
+        log_img = chain.apply(gray_img);
+
+        # for colour, put the processed luminance back and convert to BGR
 
-        log_img = gray_img.copy();
-        log_img = logarithmic_transform(log_img, constant, sigma);
+        if (use_colour):
+            output_img = merge_luminance(converted, log_img);
+        else:
+            output_img = log_img;
 
         # display image
 
-        cv2.imshow(windowName, gray_img);
-        cv2.imshow(windowName2, log_img);
+        cv2.imshow(windowName, frame if use_colour else gray_img);
+        cv2.imshow(windowName2, output_img);
 
         # start the event loop - essential
 
@@ -116,6 +122,8 @@ if cap.open(camera_to_use):
 
         if (key == ord('x')):
             keep_processing = False;
+        elif (key == ord('c')):
+            use_colour = not(use_colour);
 
     # close all windows
 
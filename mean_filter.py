@@ -14,12 +14,15 @@
 
 import cv2
 import math
+import convolution
 
 #####################################################################
 
 keep_processing = True;
 camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
 
+convolution.verbose = True; # report the choice of spatial / frequency domain filtering
+
 #####################################################################
 
 # this function is called as a call-back everytime the trackbar is moved
@@ -70,9 +73,10 @@ if cap.open(camera_to_use):
         neighbourhood = max(3, neighbourhood);
 
         # in opencv blur() performs filtering with a NxN kernel where each element has a weight of
-        # 1 / (N^2) - this is mean filtering
+        # 1 / (N^2) - this is mean filtering (here via convolution.blur(), which uses whichever of
+        # the spatial or frequency domain methods is predicted to be fastest for the kernel size)
 
-        mean_img = cv2.blur(frame, (neighbourhood,neighbourhood), borderType=cv2.BORDER_DEFAULT);
+        mean_img = convolution.blur(frame, (neighbourhood,neighbourhood), border=cv2.BORDER_DEFAULT);
 
         # display image
 
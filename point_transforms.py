@@ -0,0 +1,249 @@
+#####################################################################
+
+# Module : point (per pixel intensity) transforms of 8-bit images,
+# compiled into 256 entry look up tables (LUTs) and applied via cv2.LUT(),
+# and luminance only processing of colour images
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import cv2
+import math
+import numpy as np
+from collections import OrderedDict
+
+#####################################################################
+
+# the transforms - each maps an array of input intensities (0 -> 255, as
+# float64) to output intensities, using the same formulae as the original
+# per pixel examples
+
+# logarithmic transform
+# C - scaling constant
+# sigma - "gradient" co-efficient of logarithmic function
+
+def logarithmic(I, C, sigma):
+    return C * np.log(1 + ((math.exp(sigma) - 1) * I));
+
+# exponential transform
+# C - scaling constant
+# alpha - "gradient" co-efficient of exponential function
+
+def exponential(I, C, alpha):
+    return C * (np.power(1 + alpha, I) - 1);
+
+# power law transform
+# gamma - "gradient" co-efficient of gamma function
+
+def power_law(I, gamma):
+    return np.power(I, gamma);
+
+# gamma correction - as power_law, but of intensities normalized to 0 -> 1
+# (so that the output stays within 0 -> 255)
+
+def gamma_correction(I, gamma):
+    return 255.0 * np.power(I / 255.0, gamma);
+
+# linear contrast stretch mapping low -> 0 and high -> 255 (rounded, as
+# for cv2.normalize() with NORM_MINMAX)
+
+def contrast_stretch(I, low, high):
+    return np.rint((I - low) * (255.0 / max(high - low, 1)));
+
+# the transforms available by name
+
+transforms = {
+    "logarithmic" : logarithmic,
+    "exponential" : exponential,
+    "power_law" : power_law,
+    "gamma_correction" : gamma_correction,
+    "contrast_stretch" : contrast_stretch,
+};
+
+#####################################################################
+
+# a least recently used cache of compiled LUTs - each (transform,
+# parameters) is only compiled once, until max_tables other LUTs have
+# been used since
+
+class LUTCache:
+
+    def __init__(self, max_tables=256):
+        self.max_tables = max_tables;
+        self.tables = OrderedDict();
+
+    def get(self, key, build):
+        table = self.tables.get(key);
+        if table is not None:
+            self.tables.move_to_end(key);
+            return table;
+
+        table = build();
+        table.flags.writeable = False;
+        self.tables[key] = table;
+
+        while (len(self.tables) > self.max_tables):
+            self.tables.popitem(last=False);
+
+        return table;
+
+    def clear(self):
+        self.tables.clear();
+
+# shared cache used by compile_lut() below
+
+lut_cache = LUTCache();
+
+#####################################################################
+
+# compile (or fetch from the cache) the LUT for a transform with a given
+# set of parameters, e.g.
+#   table = compile_lut("logarithmic", C=10, sigma=0.01);
+
+# the output of the transform for each of the 256 possible inputs is
+# truncated to an integer (as int() does) and any overflow is handled by
+# 0 -> 255 clipping
+
+def compile_lut(name, **parameters):
+    if name not in transforms:
+        raise ValueError("unknown point transform: " + str(name));
+
+    def build():
+        with np.errstate(over='ignore', invalid='ignore'):
+            values = transforms[name](np.arange(256, dtype=np.float64), **parameters);
+        values = np.nan_to_num(values, nan=0, posinf=255, neginf=0);
+        return np.uint8(np.clip(np.trunc(values), 0, 255));
+
+    key = (name,) + tuple(sorted(parameters.items()));
+    return lut_cache.get(key, build);
+
+# apply a transform to an 8-bit (grayscale or colour) image via its LUT -
+# the same table is applied to each channel of a colour image
+
+def apply_transform(image, name, **parameters):
+    return cv2.LUT(image, compile_lut(name, **parameters));
+
+#####################################################################
+
+# a chain of named point transforms applied one after the other - as each
+# is a function of the 8-bit output of the one before, their LUTs compose
+# into a single LUT (the table for the whole chain) so that the whole
+# chain is applied to an image in one pass via cv2.LUT()
+
+# a step may instead apply only to one channel (e.g. 0, 1, 2 for B, G, R)
+# of a colour image, in which case the chain has a separate table for each
+# channel (applied via a single 3 channel cv2.LUT())
+
+# the table is only rebuilt when a step is added or removed, or its
+# parameters change
+
+# e.g.
+#   chain = PointTransformChain();
+#   chain.add("stretch", "contrast_stretch", low=10, high=200);
+#   chain.add("gamma", "power_law", gamma=0.8);
+#   output = chain.apply(gray_img);
+#   chain.set_parameters("gamma", gamma=1.2); # (only rebuilds the table)
+
+class PointTransformChain:
+
+    def __init__(self, channels=3):
+        self.channels = channels;
+        self.steps = OrderedDict();
+        self.table = None;
+
+    # add (or replace) a step by name, optionally for one channel only
+
+    def add(self, name, transform, channel=None, **parameters):
+        if transform not in transforms:
+            raise ValueError("unknown point transform: " + str(transform));
+        self.steps[name] = (transform, channel, dict(parameters));
+        self.table = None;
+
+    def remove(self, name):
+        del self.steps[name];
+        self.table = None;
+
+    # update some or all of the parameters of a step (only invalidating the
+    # table if any of them actually change)
+
+    def set_parameters(self, name, **parameters):
+        step_parameters = self.steps[name][2];
+        if any((step_parameters.get(key) != value) for key, value in parameters.items()):
+            step_parameters.update(parameters);
+            self.table = None;
+
+    # the composed table - 256 entries, or (256 x 1 x channels) if any step
+    # is for one channel only
+
+    def get_table(self):
+        if self.table is None:
+            per_channel = any((channel is not None) for transform, channel, parameters in self.steps.values());
+            if (per_channel):
+                table = np.tile(np.arange(256, dtype=np.uint8), (self.channels, 1));
+            else:
+                table = np.arange(256, dtype=np.uint8);
+
+            for transform, channel, parameters in self.steps.values():
+                lut = compile_lut(transform, **parameters);
+                if channel is None:
+                    table = lut[table];
+                else:
+                    table[channel] = lut[table[channel]];
+
+            if (per_channel):
+                table = np.ascontiguousarray(table.T)[:,np.newaxis,:];
+            self.table = table;
+
+        return self.table;
+
+    # apply the chain to an image - a chain with per channel steps needs an
+    # image with that many channels (cv2.LUT() would otherwise fail with an
+    # assertion), while any other chain applies to any 8-bit image
+
+    def apply(self, image):
+        table = self.get_table();
+        channels = 1 if (image.ndim == 2) else image.shape[2];
+        if (table.ndim == 3) and (channels != table.shape[2]):
+            raise ValueError("this chain has per channel steps so needs a " + str(table.shape[2])
+                             + " channel image, not " + str(channels) + " channel(s)");
+        return cv2.LUT(image, table);
+
+#####################################################################
+
+# luminance only processing of colour images - rather than processing
+# each of B, G and R (3 x the cost, and shifting the hue of each pixel),
+# the image is converted once to a colour space with a separate luminance
+# channel (YCrCb or Lab, channel 0), only the luminance is processed and
+# the result converted back to BGR
+
+# (the luminance Y of YCrCb is, to within rounding, the same as
+# cv2.COLOR_BGR2GRAY gives, so the processing matches that of the
+# grayscale examples)
+
+luminance_conversions = {
+    "YCrCb" : (cv2.COLOR_BGR2YCrCb, cv2.COLOR_YCrCb2BGR),
+    "Lab" : (cv2.COLOR_BGR2Lab, cv2.COLOR_Lab2BGR),
+};
+
+# convert a BGR image, returning the converted image and (a copy of) its
+# luminance channel to process, e.g.
+#   converted, luminance = split_luminance(frame);
+#   output = merge_luminance(converted, cv2.equalizeHist(luminance));
+
+def split_luminance(image, colour_space="YCrCb"):
+    converted = cv2.cvtColor(image, luminance_conversions[colour_space][0]);
+    return converted, cv2.extractChannel(converted, 0);
+
+# put the processed luminance back into the converted image and convert
+# it back to BGR (both in place, overwriting the converted image)
+
+def merge_luminance(converted, luminance, colour_space="YCrCb"):
+    cv2.insertChannel(luminance, converted, 0);
+    return cv2.cvtColor(converted, luminance_conversions[colour_space][1], dst=converted);
+
+#####################################################################
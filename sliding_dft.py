@@ -0,0 +1,139 @@
+#####################################################################
+
+# Module : sliding (temporal) DFT - per pixel DFT co-efficients, for a
+# few chosen frequency bins, over the last N frames of a video, updated
+# incrementally as each frame arrives
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+#####################################################################
+
+import numpy as np
+
+#####################################################################
+
+# the N point DFT of the last N values x(t-N+1) ... x(t) of each pixel,
+# for each chosen bin k, is updated from that at the previous frame by
+# the sliding DFT recurrence -
+
+#   S_k(t) = e^(2 pi i k / N) (S_k(t-1) + x(t) - x(t-N))
+
+# i.e. O(1) per pixel per bin per frame, rather than an N point FFT of
+# every pixel every frame - the last N frames are kept in a ring buffer
+# to provide x(t-N)
+
+# as the recurrence is marginally stable, rounding errors slowly
+# accumulate - so the co-efficients are recomputed exactly from the ring
+# buffer every resync_interval frames, or (if damping r < 1) the
+# recurrence is instead damped, r e^(2 pi i k / N) (S_k(t-1) + x(t) - r^N
+# x(t-N)), at the cost of slightly smoothing the spectrum
+
+# the magnitude of bin k is then the strength of any variation (e.g.
+# flicker or periodic motion) at k / N cycles per frame at each pixel
+
+# e.g.
+#   sdft = SlidingDFT(width, height, N=64, bins=[1, 2, 4]);
+#   for each frame : sdft.update(gray_frame);
+#   magnitude = sdft.magnitude(2); # (height x width) for bin 4
+
+# the number of (float32) frame values converted at a time when the
+# co-efficients are recomputed (see resync() below)
+
+resync_strip_size = 1 << 20;
+
+class SlidingDFT:
+
+    def __init__(self, width, height, N=64, bins=(1,), damping=1.0, resync_interval=1024):
+        self.width = width;
+        self.height = height;
+        self.N = N;
+        self.damping = damping;
+        self.resync_interval = resync_interval;
+
+        self.frames = None; # allocated on the first frame (with its type)
+        self.index = 0; # of the oldest frame in the ring buffer
+        self.count = 0; # frames received
+        self.spectra = None;
+        self.set_bins(bins);
+
+    # change the bins being tracked - their co-efficients are computed
+    # directly from the frames in the ring buffer
+
+    def set_bins(self, bins):
+        self.bins = np.array(bins, np.int64);
+        angles = 2 * np.pi * self.bins / self.N;
+        self.twiddles = np.complex64(self.damping * np.exp(1j * angles))[:,np.newaxis,np.newaxis];
+        self.resync();
+
+    # recompute the co-efficients of the tracked bins exactly, as the DFT
+    # of the frames in the ring buffer in time order (with zeros for those
+    # frames not yet received)
+
+    # rather than rolling the ring buffer into time order, the DFT basis is
+    # rotated to match it (slot j holds the frame at time (j - index) mod
+    # N), and the real and imaginary parts are computed separately, by two
+    # real (float32) matrix products, a strip of rows at a time - so only
+    # one strip of the frames is ever converted to float32, and no complex
+    # copy of the N frames is made
+
+    def resync(self):
+        shape = (len(self.bins), self.height, self.width);
+        if (self.spectra is None) or (self.spectra.shape != shape):
+            self.spectra = np.zeros(shape, np.complex64);
+        if self.frames is None:
+            self.spectra[...] = 0;
+            return;
+
+        t = (np.arange(self.N) - self.index) % self.N;
+        angles = -2 * np.pi * np.outer(self.bins, t) / self.N;
+        cos_basis = np.float32(np.cos(angles));
+        sin_basis = np.float32(np.sin(angles));
+
+        rows = max(1, resync_strip_size // (self.N * self.width));
+        for start in range(0, self.height, rows):
+            strip = np.float32(self.frames[:, start:start + rows].reshape(self.N, -1));
+            spectra = self.spectra[:, start:start + rows].reshape(len(self.bins), -1);
+            spectra.real = np.matmul(cos_basis, strip);
+            spectra.imag = np.matmul(sin_basis, strip);
+
+    # add the next frame (height x width), dropping the oldest
+
+    def update(self, frame):
+        if self.frames is None:
+            self.frames = np.zeros((self.N, self.height, self.width), frame.dtype);
+
+        oldest = self.frames[self.index];
+        if (self.damping < 1):
+            delta = np.float32(frame) - np.float32(self.damping ** self.N) * oldest;
+        else:
+            delta = np.float32(frame) - oldest;
+
+        self.spectra += delta;
+        self.spectra *= self.twiddles;
+
+        self.frames[self.index] = frame;
+        self.index = (self.index + 1) % self.N;
+        self.count += 1;
+
+        if ((self.damping >= 1) and (self.resync_interval > 0) and ((self.count % self.resync_interval) == 0)):
+            self.resync();
+
+        return self.spectra;
+
+    # the magnitude of the i-th tracked bin (i.e. bin self.bins[i]) at each
+    # pixel, normalized by N (so that a pixel varying as a sinusoid of
+    # amplitude a at that frequency gives a / 2)
+
+    def magnitude(self, i=0):
+        return np.abs(self.spectra[i]) / self.N;
+
+    # the frequency of the i-th tracked bin in Hz, for a given frame rate
+
+    def frequency(self, i=0, fps=25.0):
+        return self.bins[i] * fps / self.N;
+
+#####################################################################
@@ -12,6 +12,7 @@
 
 import numpy as np
 import cv2
+import convolution
 
 #####################################################################
 
@@ -29,7 +30,11 @@ if not img is None:
 
     # performing smoothing on the image using a 5x5 smoothing mark (see manual entry for GaussianBlur())
 
-    blur = cv2.GaussianBlur(img,(5,5),0);
+    # (via convolution.GaussianBlur(), which performs this in the spatial or frequency domain,
+    # whichever is predicted to be fastest for this image and kernel size - and reports its choice)
+
+    convolution.verbose = True;
+    blur = convolution.GaussianBlur(img,(5,5),0);
 
     # display this blurred image in a named window
 
@@ -0,0 +1,158 @@
+#####################################################################
+
+# Example : display the per pixel temporal fourier magnitude, at a
+# chosen frequency, over the last N image frames from a video file
+# specified on the command line (e.g. python FILE.py video_file) or from
+# an attached web camera - e.g. to detect flicker or periodic motion
+
+# Author : contributors to this repository, based on the examples by
+#          Toby Breckon, toby.breckon@durham.ac.uk
+
+# Copyright (c) 2026 contributors to this repository
+# License : LGPL - http://www.gnu.org/licenses/lgpl.html
+
+# version 0.1
+
+#####################################################################
+
+import cv2
+import sys
+import math
+from sliding_dft import SlidingDFT
+
+#####################################################################
+
+keep_processing = True;
+camera_to_use = 1; # 0 if you have one camera, 1 or > 1 otherwise
+
+window_length = 64; # N, the number of frames in the temporal DFT window
+
+#####################################################################
+
+# this function is called as a call-back everytime the trackbar is moved
+# (here we just do nothing)
+
+def nothing(x):
+    pass
+
+#####################################################################
+
+# define video capture object
+
+cap = cv2.VideoCapture();
+
+# define display window name
+
+windowName = "Live Camera Input"; # window name
+windowName2 = "Temporal Fourier Magnitude"; # window name
+
+# if command line arguments are provided try to read video_name
+# otherwise default to capture from attached H/W camera
+
+if (((len(sys.argv) == 2) and (cap.open(str(sys.argv[1]))))
+    or (cap.open(camera_to_use))):
+
+    # create windows by name (as resizable)
+
+    cv2.namedWindow(windowName, cv2.WINDOW_NORMAL);
+    cv2.namedWindow(windowName2, cv2.WINDOW_NORMAL);
+
+    # add some track bar controllers for settings - the frequency bin k
+    # (i.e. k / N cycles per frame) to display
+
+    frequency_bin = 1;
+    cv2.createTrackbar("frequency bin", windowName2, frequency_bin, window_length // 2, nothing);
+
+    # if video file successfully open then read frame from video
+
+    if (cap.isOpened):
+        ret, frame = cap.read();
+
+    # convert to grayscale
+
+    gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+
+    # use this single frame to set up the sliding DFT - this keeps the
+    # DFT co-efficient for the chosen bin at every pixel and updates it
+    # as each frame arrives (rather than performing a DFT over the last N
+    # frames at each pixel for every frame)
+
+    hieght,width = gray_frame.shape;
+    sliding_dft = SlidingDFT(width, hieght, N=window_length, bins=[frequency_bin]);
+
+    # the frame rate of the video (for reporting the frequency in Hz)
+
+    fps = cap.get(cv2.CAP_PROP_FPS);
+    if not(fps > 0):
+        fps = 25.0;
+
+    while (keep_processing):
+
+        # if video file successfully open then read frame from video
+
+        if (cap.isOpened):
+            ret, frame = cap.read();
+
+        # start a timer (to see how long processing and display takes)
+
+        start_t = cv2.getTickCount();
+
+        # convert to grayscale
+
+        gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY);
+
+        # if the chosen bin has changed then compute it from the frames
+        # already in the window (then update it incrementally as before)
+
+        if (cv2.getTrackbarPos("frequency bin", windowName2) != frequency_bin):
+            frequency_bin = cv2.getTrackbarPos("frequency bin", windowName2);
+            sliding_dft.set_bins([frequency_bin]);
+            print("Frequency bin " + str(frequency_bin) + " = "
+                  + str(round(sliding_dft.frequency(0, fps), 2)) + " Hz");
+
+        # add this frame to the sliding DFT
+
+        sliding_dft.update(gray_frame);
+
+        # normalized the magnitude at the chosen frequency into 0 -> 255 (8-bit grayscale)
+        # so we can see the output
+
+        magnitude_normalized = cv2.normalize(sliding_dft.magnitude(0), None, alpha=0, beta=255,
+                                             norm_type=cv2.NORM_MINMAX, dtype=cv2.CV_8U);
+
+        # display images
+
+        cv2.imshow(windowName,gray_frame);
+        cv2.imshow(windowName2,magnitude_normalized);
+
+        # stop timer and convert to ms. (to see how long processing and display takes)
+
+        stop_t = ((cv2.getTickCount() - start_t)/cv2.getTickFrequency()) * 1000;
+
+        # start the event loop - essential
+
+        # cv2.waitKey() is a keyboard binding function (argument is the time in milliseconds).
+        # It waits for specified milliseconds for any keyboard event.
+        # If you press any key in that time, the program continues.
+        # If 0 is passed, it waits indefinitely for a key stroke.
+        # (bitwise and with 0xFF to extract least significant byte of multi-byte response)
+
+        # here we use a wait time in ms. that takes account of processing time already used in the loop
+
+        key = cv2.waitKey(max(2, 40 - int(math.ceil(stop_t)))) & 0xFF; # wait 40ms (i.e. 1000ms / 25 fps = 40 ms)
+
+        # It can also be set to detect specific key strokes by recording which key is pressed
+
+        # e.g. if user presses "x" then exit
+
+        if (key == ord('x')):
+            keep_processing = False;
+
+    # close all windows
+
+    cv2.destroyAllWindows()
+
+else:
+    print("No video file specified or camera connected.")
+
+#####################################################################